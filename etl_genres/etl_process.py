@@ -3,7 +3,7 @@
 
 import logging
 from datetime import datetime
-from time import sleep
+from time import monotonic, sleep
 from typing import NoReturn
 
 import backoff
@@ -12,10 +12,13 @@ import elasticsearch
 import psycopg2
 from extract import ExtractorFromPostgres
 from load import ElasticLoader
+from notify import ChangeListener
+from pipeline import Pipeline, Stage
 from psycopg2.errors import InterfaceError
 from psycopg2.extras import DictCursor
 from redis import Redis
 from redis.exceptions import ConnectionError
+from serializer import ORJSONSerializer
 from transform import Transformer
 from backend_conf import Settings
 from contextlib import closing
@@ -25,24 +28,74 @@ dotenv.load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 100
 CHECK_FREQUENCY = 30
 
 
+def load_genres(
+    pipeline: Pipeline,
+    redis: Redis,
+) -> None:
+    """
+    Load genres waiting for update, failed ones are left for the next try.
+
+    Args:
+        pipeline: Pipeline - Stages to extract, transform and load genres
+        redis: Redis - Redis connection
+    """
+    genres_id = [
+        genre.decode('utf-8')
+        for genre in redis.smembers('genres_need_to_update')
+    ]
+    if not genres_id:
+        return
+    indexed_ids = pipeline.process(genres_id)
+    if indexed_ids:
+        redis.srem('genres_need_to_update', *indexed_ids)
+
+
+def listen_changes(
+    extractor: ExtractorFromPostgres,
+    pipeline: Pipeline,
+    redis: Redis,
+    listener: ChangeListener,
+    interval: int,
+) -> None:
+    """
+    Load genres changed as soon as PostgreSQL notifies about it.
+
+    Args:
+        extractor: ExtractorFromPostgres - Class check and extract data
+        pipeline: Pipeline - Stages to extract, transform and load genres
+        redis: Redis - Redis connection
+        listener: ChangeListener - Class to wait for notified changes
+        interval: int - seconds to listen before the next check of tables
+    """
+    deadline = monotonic() + interval
+    while (timeout := deadline - monotonic()) > 0:
+        changes = listener.wait(timeout)
+        if changes and extractor.find_notified_updates(changes):
+            load_genres(pipeline, redis)
+
+
 def etl_process(
     extractor: ExtractorFromPostgres,
-    transformer: Transformer,
-    loader: ElasticLoader,
+    pipeline: Pipeline,
     redis: Redis,
+    listener: ChangeListener | None = None,
+    listen_interval: int = 300,
 ) -> NoReturn:
     """
     Process the ETL pipeline in cycle.
 
+    Tables are checked for updates every CHECK_FREQUENCY seconds, or every
+    listen interval while changes notified by PostgreSQL are loaded.
+
     Args:
         extractor: ExtractorFromPostgres - Class check and extract data
-        transformer: Transformer - Class to transform genres data
-        loader: ElasticLoader - Class to load data to Elasticsearch index
+        pipeline: Pipeline - Stages to extract, transform and load genres
         redis: Redis - Redis connection
+        listener: ChangeListener - Class to wait for notified changes
+        listen_interval: int - seconds between checks of tables on listening
     """
     while True:
         try:
@@ -56,18 +109,19 @@ def etl_process(
                 )
                 logger.info('genre_last_checked %s', genre_last_checked)
             if extractor.find_tables_updates(genre_last_checked) is not None:
-                genres_id = [
-                    genre.decode('utf-8')
-                    for genre in redis.smembers('genres_need_to_update')
-                ]
-                loader.load_data(
-                    transformer.prepare_for_es(
-                        extractor.extract_genre_data(genres_id),
-                    ),
-                )
-                redis.srem('genres_need_to_update', *genres_id)
-            logger.info('Next check in %d sec', CHECK_FREQUENCY)
-            sleep(CHECK_FREQUENCY)
+                load_genres(pipeline, redis)
+            if listener is None:
+                logger.info('Next check in %d sec', CHECK_FREQUENCY)
+                sleep(CHECK_FREQUENCY)
+                continue
+            logger.info('Next check in %d sec', listen_interval)
+            listen_changes(
+                extractor,
+                pipeline,
+                redis,
+                listener,
+                listen_interval,
+            )
         except Exception as pipeline_error:
             logger.error(
                 '%s\n\nRetrying in %d sec',
@@ -89,7 +143,10 @@ def main() -> NoReturn:
     """Init the backend connections to databases and start ETL pipeline."""
     settings = Settings()
 
-    with Redis(host=settings.REDIS.HOST) as redis_conn:
+    with Redis(host=settings.REDIS.HOST) as redis_conn, Redis(
+        host=settings.CACHE_REDIS.API_HOST,
+        port=settings.CACHE_REDIS.PORT,
+    ) as cache_redis_conn:
         with closing(
             psycopg2.connect(
                 **settings.POSTGRES.dict(by_alias=True),
@@ -107,6 +164,7 @@ def main() -> NoReturn:
                     settings.ELASTICSEARCH.USERNAME,
                     settings.ELASTICSEARCH.PASSWORD,
                 ),
+                serializer=ORJSONSerializer(),
             ) as elastic:
                 extractor = ExtractorFromPostgres(
                     pg_connection=pg_conn,
@@ -117,14 +175,47 @@ def main() -> NoReturn:
                     elastic,
                     index_info='es_schema.json',
                     redis=redis_conn,
-                    chunk_size=CHUNK_SIZE,
+                    chunk_size=settings.ELASTICSEARCH.BULK_CHUNK_SIZE,
+                    cache_redis=cache_redis_conn,
+                    thread_count=settings.ELASTICSEARCH.BULK_THREADS,
+                    max_chunk_bytes=settings.ELASTICSEARCH.BULK_MAX_CHUNK_BYTES,
+                    reindexed_expire=settings.CACHE_REDIS.REINDEXED_EXPIRE,
                 )
-                etl_process(
-                    extractor=extractor,
-                    transformer=transformer,
-                    loader=loader,
-                    redis=redis_conn,
+                loader.update_mapping()
+                # The extract stage shares one PostgreSQL connection, so it
+                # has a single worker.
+                pipeline = Pipeline(
+                    stages=[
+                        Stage('extract', extractor.extract_genre_data),
+                        Stage('transform', transformer.prepare_for_es),
+                        Stage(
+                            'load',
+                            loader.load_data,
+                            concurrency=settings.PIPELINE.LOAD_CONCURRENCY,
+                        ),
+                    ],
+                    batch_size=settings.PIPELINE.BATCH_SIZE,
+                    queue_size=settings.PIPELINE.QUEUE_SIZE,
+                    report_interval=settings.PIPELINE.REPORT_INTERVAL,
                 )
+                listener = None
+                if settings.NOTIFY.ENABLED:
+                    listener = ChangeListener(
+                        dsn=settings.POSTGRES.dict(by_alias=True),
+                        debounce=settings.NOTIFY.DEBOUNCE,
+                        max_delay=settings.NOTIFY.MAX_DELAY,
+                    )
+                try:
+                    etl_process(
+                        extractor=extractor,
+                        pipeline=pipeline,
+                        redis=redis_conn,
+                        listener=listener,
+                        listen_interval=settings.NOTIFY.FALLBACK_INTERVAL,
+                    )
+                finally:
+                    if listener is not None:
+                        listener.close()
 
 
 if __name__ == '__main__':
@@ -108,6 +108,49 @@ class ExtractorFromPostgres:
         logger.info('There are no genres for update')
         return None
 
+    @backoff.on_exception(
+        backoff.expo,
+        (
+            OperationalError,
+            InterfaceError,
+            ConnectionDoesNotExist,
+            ConnectionFailure,
+            ConnectionException,
+        ),
+    )
+    def find_notified_updates(self, changes: dict[str, set]) -> set:
+        """
+        Save genres ids affected by notified changes to Redis.
+
+        Args:
+            changes: dict - changed rows ids by table name.
+
+        Returns:
+            Set of genres ids that need to be updated at the moment.
+        """
+        params = {
+            table: list(changes.get(table, ())) for table in self.tables
+        }
+        if not any(params.values()):
+            return set()
+        with self.pg_connection.cursor() as pg_cursor:
+            pg_cursor.execute(
+                """
+                SELECT id::text FROM genre
+                WHERE id = ANY(%(genre)s::uuid[])
+                """,
+                params,
+            )
+            genres_need_to_update = {row[0] for row in pg_cursor.fetchall()}
+
+        if genres_need_to_update:
+            self.redis.sadd('genres_need_to_update', *genres_need_to_update)
+            logger.info(
+                'There are %d genres changed',
+                len(genres_need_to_update),
+            )
+        return genres_need_to_update
+
     @backoff.on_exception(
         backoff.expo,
         (
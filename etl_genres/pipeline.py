@@ -0,0 +1,153 @@
+"""Module for running ETL stages at the same time on different batches."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Put in a queue after the last batch, once for every worker reading it.
+DONE = object()
+
+
+@dataclass
+class Stage:
+    """Step of the pipeline with its own workers and counters."""
+
+    name: str
+    handler: Callable[[list], Iterable]
+    concurrency: int = 1
+    batches: int = 0
+    items: int = 0
+    busy: float = 0.0
+
+    def process(self, batch: list) -> list:
+        """Run the handler and read all its results in a worker thread."""
+        return list(self.handler(batch))
+
+
+@dataclass
+class Pipeline:
+    """
+    Class for passing batches through stages connected by bounded queues.
+
+    Handlers of stages are blocking, so every worker runs them in a thread.
+    While one batch is loaded the next ones are transformed and extracted,
+    the queues stop a fast stage when a slow one does not keep up.
+    """
+
+    stages: list[Stage]
+    batch_size: int = 500
+    queue_size: int = 4
+    report_interval: float = 10
+
+    def process(self, ids: list) -> list:
+        """
+        Pass ids through all stages by batches.
+
+        Args:
+            ids: list - ids of documents to process.
+
+        Returns:
+            Results of the last stage for all batches.
+        """
+        batches = [
+            ids[start:start + self.batch_size]
+            for start in range(0, len(ids), self.batch_size)
+        ]
+        return asyncio.run(self.run(batches))
+
+    async def run(self, batches: list[list]) -> list:
+        for stage in self.stages:
+            stage.batches, stage.items, stage.busy = 0, 0, 0.0
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        results = []
+        started = time.monotonic()
+        tasks = [
+            asyncio.create_task(
+                self.feed(batches, queues[0], self.stages[0].concurrency),
+            ),
+        ]
+        for number, stage in enumerate(self.stages):
+            if number + 1 < len(self.stages):
+                output = queues[number + 1]
+                readers = self.stages[number + 1].concurrency
+            else:
+                output, readers = None, 0
+            tasks.append(
+                asyncio.create_task(
+                    self.run_stage(
+                        stage, queues[number], output, readers, results,
+                    ),
+                ),
+            )
+        reporter = asyncio.create_task(self.report(queues, started))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in (*tasks, reporter):
+                task.cancel()
+            self.log_metrics(queues, started)
+        return [item for result in results for item in result]
+
+    @staticmethod
+    async def feed(
+        batches: list[list],
+        queue: asyncio.Queue,
+        readers: int,
+    ) -> None:
+        for batch in batches:
+            await queue.put(batch)
+        for _ in range(readers):
+            await queue.put(DONE)
+
+    @staticmethod
+    async def run_stage(
+        stage: Stage,
+        input: asyncio.Queue,
+        output: asyncio.Queue | None,
+        readers: int,
+        results: list,
+    ) -> None:
+        async def work() -> None:
+            while True:
+                batch = await input.get()
+                if batch is DONE:
+                    return
+                started = time.monotonic()
+                result = await asyncio.to_thread(stage.process, batch)
+                stage.busy += time.monotonic() - started
+                stage.batches += 1
+                stage.items += len(result)
+                if output is None:
+                    results.append(result)
+                else:
+                    await output.put(result)
+
+        await asyncio.gather(*(work() for _ in range(stage.concurrency)))
+        for _ in range(readers):
+            await output.put(DONE)
+
+    async def report(self, queues: list[asyncio.Queue], started: float):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.log_metrics(queues, started)
+
+    def log_metrics(self, queues: list[asyncio.Queue], started: float):
+        """Log throughput, load of workers and batches waiting by stage."""
+        elapsed = time.monotonic() - started
+        for stage, queue in zip(self.stages, queues):
+            logger.info(
+                'Stage %s: %d batches, %d items, %.1f items/sec, '
+                '%.0f%% busy, %d batches queued',
+                stage.name,
+                stage.batches,
+                stage.items,
+                stage.items / elapsed if elapsed else 0,
+                100 * stage.busy / (elapsed * stage.concurrency)
+                if elapsed else 0,
+                queue.qsize(),
+            )
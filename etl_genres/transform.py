@@ -1,6 +1,7 @@
 """Module for transforming genres data to relevant format for Elasticsearch."""
 
 
+import json
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime
@@ -58,13 +59,32 @@ class Transformer:
         Yields:
             Dictionary mapping genres data for in Elasticsearch.
         """
-        genre = {}
         for data in self.get_transformed_genres(genres_data):
+            genre = {}
             genre['uuid'] = data['id']
             genre['name'] = data['name']
             genre['description'] = data['description']
+            genre['rendered'] = self.render(genre)
             yield {
                 '_index': 'genres',
                 '_id': genre['uuid'],
                 '_source': genre,
             }
+
+    @staticmethod
+    def render(genre: dict) -> str:
+        """
+        Render the genre exactly as the API responds with it.
+
+        Args:
+            genre: dict - genre document.
+
+        Returns:
+            JSON of the genre details response.
+        """
+        return json.dumps(
+            {'uuid': genre['uuid'], 'name': genre['name']},
+            default=str,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
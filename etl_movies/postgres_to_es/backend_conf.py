@@ -36,6 +36,61 @@ class PostgresSettings(BaseSettings):
         alias_generator = to_lower
 
 
+class ExtractSettings(BaseSettings):
+    """Configuration for movies extraction from PostgreSQL."""
+
+    BATCH_SIZE: int = 1000
+    ITERSIZE: int = 500
+    PAGE_SIZE: int = 1000
+    LAG: int = 5
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'EXTRACT_'
+
+
+class PipelineSettings(BaseSettings):
+    """Configuration for stages of the ETL pipeline."""
+
+    BATCH_SIZE: int = 500
+    QUEUE_SIZE: int = 4
+    LOAD_CONCURRENCY: int = 2
+    REPORT_INTERVAL: int = 10
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'PIPELINE_'
+
+
+class NotifySettings(BaseSettings):
+    """Configuration for changes notified by PostgreSQL triggers."""
+
+    ENABLED: bool = False
+    DEBOUNCE: float = 0.2
+    MAX_DELAY: float = 1.0
+    FALLBACK_INTERVAL: int = 300
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'NOTIFY_'
+
+
+class SimilarSettings(BaseSettings):
+    """Configuration for refreshing lists of similar films."""
+
+    BATCH_SIZE: int = 500
+    MAX_AGE: int = 86400
+    COUNT: int = 50
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'SIMILAR_'
+
+
 class ElasticSettings(BaseSettings):
     """Configuration for Elasticsearch."""
 
@@ -43,6 +98,9 @@ class ElasticSettings(BaseSettings):
     PORT: int
     USERNAME: str
     PASSWORD: str
+    BULK_THREADS: int = 4
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_CHUNK_BYTES: int = 100 * 1024 * 1024
 
     class Config:
         """Configuration class for correct env variables insertion."""
@@ -61,9 +119,27 @@ class RedisSettings(BaseSettings):
         env_prefix = 'REDIS_ETL_'
 
 
+class CacheRedisSettings(BaseSettings):
+    """Configuration for Redis with cached API responses."""
+
+    API_HOST: str
+    PORT: int
+    REINDEXED_EXPIRE: int = 30
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'REDIS_CACHE_'
+
+
 class Settings(BaseSettings):
     """Helper class for configuration access."""
 
     POSTGRES = PostgresSettings()
+    EXTRACT = ExtractSettings()
+    PIPELINE = PipelineSettings()
+    NOTIFY = NotifySettings()
+    SIMILAR = SimilarSettings()
     ELASTICSEARCH = ElasticSettings()
     REDIS = RedisSettings()
+    CACHE_REDIS = CacheRedisSettings()
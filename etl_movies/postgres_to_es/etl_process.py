@@ -2,8 +2,7 @@
 
 
 import logging
-from datetime import datetime
-from time import sleep
+from time import monotonic, sleep
 from typing import NoReturn
 
 import backoff
@@ -12,10 +11,14 @@ import elasticsearch
 import psycopg2
 from extract import ExtractorFromPostgres
 from load import ElasticLoader
+from notify import ChangeListener
+from pipeline import Pipeline, Stage
 from psycopg2.errors import InterfaceError
 from psycopg2.extras import DictCursor
 from redis import Redis
 from redis.exceptions import ConnectionError
+from serializer import ORJSONSerializer
+from similar import SimilarRefresher
 from transform import Transformer
 from backend_conf import Settings
 from contextlib import closing
@@ -25,49 +28,137 @@ dotenv.load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 100
 CHECK_FREQUENCY = 30
 
 
+def load_movies(
+    extractor: ExtractorFromPostgres,
+    pipeline: Pipeline,
+    redis: Redis,
+    similar: SimilarRefresher,
+) -> None:
+    """
+    Load movies waiting for update, failed ones are left for the next try.
+
+    Movies deleted from PostgreSQL are not extracted, so they are dropped
+    from the set instead.
+
+    Args:
+        extractor: ExtractorFromPostgres - Class check and extract data
+        pipeline: Pipeline - Stages to extract, transform and load movies
+        redis: Redis - Redis connection
+        similar: SimilarRefresher - Class to refresh similar films lists
+    """
+    movies_id = [
+        movie.decode('utf-8')
+        for movie in redis.smembers('need_to_update')
+    ]
+    if not movies_id:
+        return
+    indexed_ids = pipeline.process(movies_id)
+    if indexed_ids:
+        redis.srem('need_to_update', *indexed_ids)
+        similar.schedule(indexed_ids)
+    not_indexed = list(set(movies_id) - set(indexed_ids))
+    if not not_indexed:
+        return
+    missing = extractor.find_missing_movies(not_indexed)
+    if missing:
+        logger.warning(
+            'Movies %s are missing in PostgreSQL, dropped from update',
+            ', '.join(sorted(missing)),
+        )
+        redis.srem('need_to_update', *missing)
+        similar.schedule(list(missing))
+
+
+def listen_changes(
+    extractor: ExtractorFromPostgres,
+    pipeline: Pipeline,
+    redis: Redis,
+    similar: SimilarRefresher,
+    listener: ChangeListener,
+    interval: int,
+) -> None:
+    """
+    Load movies changed as soon as PostgreSQL notifies about it.
+
+    Args:
+        extractor: ExtractorFromPostgres - Class check and extract data
+        pipeline: Pipeline - Stages to extract, transform and load movies
+        redis: Redis - Redis connection
+        similar: SimilarRefresher - Class to refresh similar films lists
+        listener: ChangeListener - Class to wait for notified changes
+        interval: int - seconds to listen before the next check of tables
+    """
+    deadline = monotonic() + interval
+    while (timeout := deadline - monotonic()) > 0:
+        changes = listener.wait(min(timeout, CHECK_FREQUENCY))
+        if changes and extractor.find_notified_updates(changes):
+            load_movies(extractor, pipeline, redis, similar)
+        similar.refresh()
+
+
 def etl_process(
     extractor: ExtractorFromPostgres,
-    transformer: Transformer,
-    loader: ElasticLoader,
+    pipeline: Pipeline,
     redis: Redis,
+    similar: SimilarRefresher,
+    listener: ChangeListener | None = None,
+    listen_interval: int = 300,
 ) -> NoReturn:
     """
     Process the ETL pipeline in cycle.
 
+    Tables are checked for updates every CHECK_FREQUENCY seconds, or every
+    listen interval while changes notified by PostgreSQL are loaded. A batch
+    of similar films lists is refreshed every CHECK_FREQUENCY seconds.
+
     Args:
         extractor: ExtractorFromPostgres - Class check and extract data
-        transformer: Transformer - Class to transform movies data
-        loader: ElasticLoader - Class to load data to Elasticsearch index
+        pipeline: Pipeline - Stages to extract, transform and load movies
         redis: Redis - Redis connection
+        similar: SimilarRefresher - Class to refresh similar films lists
+        listener: ChangeListener - Class to wait for notified changes
+        listen_interval: int - seconds between checks of tables on listening
     """
     while True:
         try:
-            if redis.get('last_checked') is None:
-                last_checked: datetime = datetime(1970, 1, 1)
-            else:
-                date_from_redis = redis.get('last_checked')
-                last_checked: datetime = datetime.strptime(
-                    date_from_redis.decode('utf-8'),
-                    '"%Y-%m-%d %H:%M:%S.%f+00:00"',
-                )
-                logger.info('last_checked %s', last_checked)
-            if extractor.find_tables_updates(last_checked) is not None:
-                movies_id = [
-                    movie.decode('utf-8')
-                    for movie in redis.smembers('need_to_update')
-                ]
-                loader.load_data(
-                    transformer.prepare_for_es(
-                        extractor.extract_filmwork_data(movies_id),
-                    ),
+            # Movies failed to load in the previous checks.
+            load_movies(extractor, pipeline, redis, similar)
+            logger.info('Checking tables for updates')
+            watermarks = extractor.get_watermarks()
+            while True:
+                movies_id, next_watermarks = extractor.find_tables_updates(
+                    watermarks,
                 )
-                redis.srem('need_to_update', *movies_id)
-            logger.info('Next check in %d sec', CHECK_FREQUENCY)
-            sleep(CHECK_FREQUENCY)
+                if next_watermarks == watermarks:
+                    break
+                if movies_id:
+                    redis.sadd('need_to_update', *movies_id)
+                    logger.info(
+                        'There are %d movies need to be updated',
+                        len(movies_id),
+                    )
+                    load_movies(extractor, pipeline, redis, similar)
+                # Movies of the page are loaded or wait for the next try
+                # in the set, so the page is done.
+                extractor.save_watermarks(next_watermarks)
+                watermarks = next_watermarks
+            similar.refresh()
+            if listener is None:
+                logger.info('Next check in %d sec', CHECK_FREQUENCY)
+                sleep(CHECK_FREQUENCY)
+                continue
+            logger.info('Next check in %d sec', listen_interval)
+            listen_changes(
+                extractor,
+                pipeline,
+                redis,
+                similar,
+                listener,
+                listen_interval,
+            )
         except Exception as pipeline_error:
             logger.error(
                 '%s\n\nRetrying in %d sec',
@@ -89,7 +180,10 @@ def main() -> NoReturn:
     """Init the backend connections to databases and start ETL pipeline."""
     settings = Settings()
 
-    with Redis(host=settings.REDIS.HOST) as redis_conn:
+    with Redis(host=settings.REDIS.HOST) as redis_conn, Redis(
+        host=settings.CACHE_REDIS.API_HOST,
+        port=settings.CACHE_REDIS.PORT,
+    ) as cache_redis_conn:
         with closing(
             psycopg2.connect(
                 **settings.POSTGRES.dict(by_alias=True),
@@ -107,24 +201,72 @@ def main() -> NoReturn:
                     settings.ELASTICSEARCH.USERNAME,
                     settings.ELASTICSEARCH.PASSWORD,
                 ),
+                serializer=ORJSONSerializer(),
             ) as elastic:
                 extractor = ExtractorFromPostgres(
                     pg_connection=pg_conn,
                     redis=redis_conn,
+                    batch_size=settings.EXTRACT.BATCH_SIZE,
+                    itersize=settings.EXTRACT.ITERSIZE,
+                    page_size=settings.EXTRACT.PAGE_SIZE,
+                    lag=settings.EXTRACT.LAG,
+                    similar_count=settings.SIMILAR.COUNT,
                 )
                 transformer = Transformer(redis_conn)
                 loader = ElasticLoader(
                     elastic,
                     index_info='es_schema.json',
                     redis=redis_conn,
-                    chunk_size=CHUNK_SIZE,
+                    chunk_size=settings.ELASTICSEARCH.BULK_CHUNK_SIZE,
+                    cache_redis=cache_redis_conn,
+                    thread_count=settings.ELASTICSEARCH.BULK_THREADS,
+                    max_chunk_bytes=settings.ELASTICSEARCH.BULK_MAX_CHUNK_BYTES,
+                    reindexed_expire=settings.CACHE_REDIS.REINDEXED_EXPIRE,
+                )
+                loader.update_mapping()
+                # The extract stage shares one PostgreSQL connection, so it
+                # has a single worker.
+                pipeline = Pipeline(
+                    stages=[
+                        Stage('extract', extractor.extract_filmwork_data),
+                        Stage('transform', transformer.prepare_for_es),
+                        Stage(
+                            'load',
+                            loader.load_data,
+                            concurrency=settings.PIPELINE.LOAD_CONCURRENCY,
+                        ),
+                    ],
+                    batch_size=settings.PIPELINE.BATCH_SIZE,
+                    queue_size=settings.PIPELINE.QUEUE_SIZE,
+                    report_interval=settings.PIPELINE.REPORT_INTERVAL,
                 )
-                etl_process(
+                similar = SimilarRefresher(
                     extractor=extractor,
                     transformer=transformer,
                     loader=loader,
                     redis=redis_conn,
+                    batch_size=settings.SIMILAR.BATCH_SIZE,
+                    max_age=settings.SIMILAR.MAX_AGE,
                 )
+                listener = None
+                if settings.NOTIFY.ENABLED:
+                    listener = ChangeListener(
+                        dsn=settings.POSTGRES.dict(by_alias=True),
+                        debounce=settings.NOTIFY.DEBOUNCE,
+                        max_delay=settings.NOTIFY.MAX_DELAY,
+                    )
+                try:
+                    etl_process(
+                        extractor=extractor,
+                        pipeline=pipeline,
+                        redis=redis_conn,
+                        similar=similar,
+                        listener=listener,
+                        listen_interval=settings.NOTIFY.FALLBACK_INTERVAL,
+                    )
+                finally:
+                    if listener is not None:
+                        listener.close()
 
 
 if __name__ == '__main__':
@@ -2,7 +2,6 @@
 
 import json
 import logging
-import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Generator
@@ -21,6 +20,135 @@ from redis import Redis
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Weights of what films share, a shared person says more about similarity
+# than a shared genre. The sum is raised by the rating, counted in tenths,
+# so scores are whole numbers and ties are exact. The API ranks its search
+# of similar films the same.
+SIMILAR_GENRE_WEIGHT = 1.0
+SIMILAR_PERSON_WEIGHT = 2.0
+SIMILAR_QUERY = """
+    SELECT
+        filmwork.id::text AS filmwork_id,
+        (
+            SELECT COALESCE (
+                json_agg(
+                    json_build_object(
+                        'uuid', similar_film.id,
+                        'title', similar_film.title,
+                        'imdb_rating', similar_film.rating
+                    )
+                    ORDER BY similar_film.score DESC, similar_film.id
+                ),
+                '[]'
+            )
+            FROM (
+                SELECT
+                    other.id,
+                    other.title,
+                    other.rating,
+                    SUM(shared.weight)
+                        * (100 + ROUND(COALESCE(other.rating, 0) * 10))
+                        AS score
+                FROM (
+                    SELECT film_work_id, {genre_weight} AS weight
+                    FROM genre_film_work
+                    WHERE genre_id IN (
+                        SELECT genre_id FROM genre_film_work
+                        WHERE film_work_id = filmwork.id
+                    )
+                    UNION ALL
+                    SELECT film_work_id, {person_weight} AS weight
+                    FROM (
+                        SELECT DISTINCT film_work_id, person_id
+                        FROM person_film_work
+                        WHERE person_id IN (
+                            SELECT person_id FROM person_film_work
+                            WHERE film_work_id = filmwork.id
+                        )
+                    ) AS shared_persons
+                ) AS shared
+                JOIN film_work AS other ON other.id = shared.film_work_id
+                WHERE other.id <> filmwork.id
+                GROUP BY other.id
+                ORDER BY score DESC, other.id
+                LIMIT %(similar_count)s
+            ) AS similar_film
+        ) AS similar
+    FROM film_work AS filmwork
+    WHERE filmwork.id = ANY(%(movies)s::uuid[])
+""".format(
+    genre_weight=SIMILAR_GENRE_WEIGHT,
+    person_weight=SIMILAR_PERSON_WEIGHT,
+)
+
+# Tables are read in (updated_at, id) order from the last processed row,
+# a page at a time. Rows changed in the last seconds are left for the next
+# check, as transactions still running can commit rows with older time.
+WATERMARK_PREFIX = 'watermark:'
+INITIAL_UPDATED_AT = datetime(1970, 1, 1, tzinfo=timezone.utc)
+INITIAL_ID = '00000000-0000-0000-0000-000000000000'
+UPDATES_QUERY = """
+    WITH changed_film_work AS (
+        SELECT id, updated_at FROM film_work
+        WHERE (updated_at, id) > (
+            %(film_work_updated_at)s, %(film_work_id)s::uuid
+        )
+            AND updated_at < clock_timestamp() - make_interval(secs => %(lag)s)
+        ORDER BY updated_at, id
+        LIMIT %(page_size)s
+    ), changed_genre AS (
+        SELECT id, updated_at FROM genre
+        WHERE (updated_at, id) > (%(genre_updated_at)s, %(genre_id)s::uuid)
+            AND updated_at < clock_timestamp() - make_interval(secs => %(lag)s)
+        ORDER BY updated_at, id
+        LIMIT %(page_size)s
+    ), changed_person AS (
+        SELECT id, updated_at FROM person
+        WHERE (updated_at, id) > (%(person_updated_at)s, %(person_id)s::uuid)
+            AND updated_at < clock_timestamp() - make_interval(secs => %(lag)s)
+        ORDER BY updated_at, id
+        LIMIT %(page_size)s
+    )
+    SELECT
+        'film_work' AS table_name,
+        last_row.updated_at,
+        last_row.id,
+        ARRAY(SELECT id::text FROM changed_film_work) AS movies
+    FROM (
+        SELECT updated_at, id FROM changed_film_work
+        ORDER BY updated_at DESC, id DESC
+        LIMIT 1
+    ) AS last_row
+    UNION ALL
+    SELECT
+        'genre',
+        last_row.updated_at,
+        last_row.id,
+        ARRAY(
+            SELECT DISTINCT film_work_id::text FROM genre_film_work
+            WHERE genre_id IN (SELECT id FROM changed_genre)
+        )
+    FROM (
+        SELECT updated_at, id FROM changed_genre
+        ORDER BY updated_at DESC, id DESC
+        LIMIT 1
+    ) AS last_row
+    UNION ALL
+    SELECT
+        'person',
+        last_row.updated_at,
+        last_row.id,
+        ARRAY(
+            SELECT DISTINCT film_work_id::text FROM person_film_work
+            WHERE person_id IN (SELECT id FROM changed_person)
+        )
+    FROM (
+        SELECT updated_at, id FROM changed_person
+        ORDER BY updated_at DESC, id DESC
+        LIMIT 1
+    ) AS last_row
+"""
+
 
 @dataclass
 class ExtractorFromPostgres:
@@ -28,6 +156,11 @@ class ExtractorFromPostgres:
 
     pg_connection: connection
     redis: Redis
+    batch_size: int = 1000
+    itersize: int = 500
+    page_size: int = 1000
+    lag: int = 5
+    similar_count: int = 50
 
     tables = [
         'film_work',
@@ -45,112 +178,169 @@ class ExtractorFromPostgres:
             ConnectionException,
         ),
     )
-    def find_tables_updates(self, last_checked: datetime) -> set | None:
+    def find_tables_updates(
+        self,
+        watermarks: dict[str, tuple[datetime, str]],
+    ) -> tuple[set, dict[str, tuple[datetime, str]]]:
         """
-        Check if tables have been updated and save movies ids to Redis.
+        Get the next page of tables updates as affected movies ids.
 
         Args:
-            last_checked: datetime - last check on the database updates.
+            watermarks: dict - (updated_at, id) of the last processed row
+                of every table.
 
         Returns:
-            Set of movies ids that need to be updated in the moment.
-            None if tables have not been updated.
+            Set of movies ids to update and watermarks after the page.
+            Empty set and the same watermarks if there are no updates.
         """
+        params = {'page_size': self.page_size, 'lag': self.lag}
+        for table in self.tables:
+            params[f'{table}_updated_at'], params[f'{table}_id'] = (
+                watermarks[table]
+            )
         with self.pg_connection.cursor() as pg_cursor:
-            updates_in_tables = {}
-            logger.info('Checking tables for updates')
-            for table in self.tables:
-                pg_cursor.execute(
-                    f"""
-                    SELECT id, updated_at FROM {table}
-                    WHERE updated_at > TIMESTAMP '{last_checked}'
-                    ORDER BY updated_at
-                    """,
-                )
-                updates_in_tables[table] = dict(pg_cursor.fetchall())
-            movies = [item for item in updates_in_tables['film_work'].keys()]
-            persons = [item for item in updates_in_tables['person'].keys()]
-            genres = [item for item in updates_in_tables['genre'].keys()]
+            pg_cursor.execute(UPDATES_QUERY, params)
+            pages = pg_cursor.fetchall()
 
-            if persons:
-                pg_cursor.execute(
-                    """
-                    SELECT DISTINCT
-                        filmwork.id
-                    FROM film_work AS filmwork
-                    LEFT JOIN
-                        person_film_work as person_film_work 
-                            ON
-                        filmwork.id = person_film_work.film_work_id
-                    LEFT JOIN 
-                        person as person 
-                            ON 
-                        person.id = person_film_work.person_id
-                    WHERE person.id IN {0}
-                    """.format(
-                        re.sub(
-                            r',\s*\)',
-                            ')',
-                            str(tuple(persons)),
-                        ),
-                    ),
-                )
-            movies_from_persons_update = [
-                movie[0] for movie in pg_cursor.fetchall()
-            ]
+        movies_need_to_update = set()
+        watermarks = dict(watermarks)
+        for page in pages:
+            movies_need_to_update.update(page['movies'])
+            watermarks[page['table_name']] = (
+                page['updated_at'],
+                str(page['id']),
+            )
+            logger.info(
+                'Table %s updated till %s',
+                page['table_name'],
+                page['updated_at'],
+            )
+        return movies_need_to_update, watermarks
 
-            if genres:
-                pg_cursor.execute(
-                    """
-                    SELECT DISTINCT
-                        filmwork.id
-                    FROM film_work AS filmwork
-                    LEFT JOIN 
-                        genre_film_work as genre_film_work 
-                            ON 
-                        filmwork.id = genre_film_work.film_work_id
-                    LEFT JOIN 
-                        genre as genre 
-                            ON 
-                        genre.id = genre_film_work.genre_id
-                    WHERE genre.id IN {0}
-                    """.format(
-                        re.sub(
-                            r',\s*\)',
-                            ')',
-                            str(tuple(genres)),
-                        ),
-                    ),
-                )
+    @backoff.on_exception(
+        backoff.expo,
+        (
+            OperationalError,
+            InterfaceError,
+            ConnectionDoesNotExist,
+            ConnectionFailure,
+            ConnectionException,
+        ),
+    )
+    def find_notified_updates(self, changes: dict[str, set]) -> set:
+        """
+        Save movies ids affected by notified changes to Redis.
 
-            movies_form_genres_update = [
-                movie[0] for movie in pg_cursor.fetchall()
-            ]
+        Args:
+            changes: dict - changed rows ids by table name.
 
-        movies_need_to_update = set().union(
-            movies,
-            movies_form_genres_update,
-            movies_from_persons_update,
-        )
-        self.redis.set(
-            'last_checked',
-            json.dumps(
-                datetime.now(timezone.utc),
-                default=str,
-            ),
-        )
+        Returns:
+            Set of movies ids that need to be updated at the moment.
+        """
+        params = {
+            table: list(changes.get(table, ())) for table in self.tables
+        }
+        if not any(params.values()):
+            return set()
+        with self.pg_connection.cursor() as pg_cursor:
+            pg_cursor.execute(
+                """
+                SELECT id::text FROM film_work
+                WHERE id = ANY(%(film_work)s::uuid[])
+                UNION
+                SELECT film_work_id::text FROM genre_film_work
+                WHERE genre_id = ANY(%(genre)s::uuid[])
+                UNION
+                SELECT film_work_id::text FROM person_film_work
+                WHERE person_id = ANY(%(person)s::uuid[])
+                """,
+                params,
+            )
+            movies_need_to_update = {row[0] for row in pg_cursor.fetchall()}
 
         if movies_need_to_update:
-            for movie in list(movies_need_to_update):
-                self.redis.sadd('need_to_update', movie)
+            self.redis.sadd('need_to_update', *movies_need_to_update)
             logger.info(
-                'There are %d movies need to be updated',
+                'There are %d movies changed',
                 len(movies_need_to_update),
             )
-            return movies_need_to_update
+        return movies_need_to_update
+
+    @backoff.on_exception(
+        backoff.expo,
+        (
+            OperationalError,
+            InterfaceError,
+            ConnectionDoesNotExist,
+            ConnectionFailure,
+            ConnectionException,
+        ),
+    )
+    def find_missing_movies(self, movies: list) -> set:
+        """
+        Find movies deleted from the PostgreSQL database.
+
+        Args:
+            movies: list of movies ids to look for.
+
+        Returns:
+            Set of movies ids missing in the database.
+        """
+        with self.pg_connection.cursor() as pg_cursor:
+            pg_cursor.execute(
+                """
+                SELECT id::text FROM unnest(%s::uuid[]) AS id
+                EXCEPT
+                SELECT id::text FROM film_work
+                """,
+                (movies,),
+            )
+            return {row[0] for row in pg_cursor.fetchall()}
+
+    def get_watermarks(self) -> dict[str, tuple[datetime, str]]:
+        """
+        Read (updated_at, id) of the last processed row of every table.
+
+        Returns:
+            Watermarks by table name, tables never processed start from
+            the last check or the beginning.
+        """
+        # Time of the last check before watermarks were introduced.
+        last_checked = self.redis.get('last_checked')
+        initial_updated_at = INITIAL_UPDATED_AT
+        if last_checked is not None:
+            initial_updated_at = datetime.fromisoformat(
+                json.loads(last_checked),
+            )
+        watermarks = {}
+        for table in self.tables:
+            watermark = self.redis.get(f'{WATERMARK_PREFIX}{table}')
+            if watermark is None:
+                watermarks[table] = (initial_updated_at, INITIAL_ID)
+                continue
+            updated_at, id = json.loads(watermark)
+            watermarks[table] = (datetime.fromisoformat(updated_at), id)
+        return watermarks
+
+    def save_watermarks(
+        self,
+        watermarks: dict[str, tuple[datetime, str]],
+    ) -> None:
+        """
+        Save watermarks once the movies of their page are loaded.
 
-        logger.info('There are no movies for update')
-        return None
+        Args:
+            watermarks: dict - (updated_at, id) of the last processed row
+                of every table.
+        """
+        self.redis.mset(
+            {
+                f'{WATERMARK_PREFIX}{table}': json.dumps(
+                    [updated_at.isoformat(), id],
+                )
+                for table, (updated_at, id) in watermarks.items()
+            },
+        )
 
     @backoff.on_exception(
         backoff.expo,
@@ -170,13 +360,18 @@ class ExtractorFromPostgres:
         Extract whole movies information from the PostgreSQL database.
 
         Args:
-            movies: list of movies ids to extract from the PostgreSQL database.
+            movies: list of movies ids to extract from the PostgreSQL database,
+                read by batch_size ids with one query.
 
         Yields:
             Dictionary mapping movies information.
         """
-        with self.pg_connection.cursor() as pg_cursor:
-            for movie in movies:
+        for start in range(0, len(movies), self.batch_size):
+            batch = movies[start:start + self.batch_size]
+            # Named cursor keeps the result on the server and fetches it
+            # by itersize rows instead of loading the whole batch at once.
+            with self.pg_connection.cursor('filmwork_data') as pg_cursor:
+                pg_cursor.itersize = self.itersize
                 pg_cursor.execute(
                     """
                     SELECT
@@ -224,12 +419,42 @@ class ExtractorFromPostgres:
                         person as person 
                             ON 
                         person.id = person_film_work.person_id
-                    WHERE filmwork.id = '{0}'
+                    WHERE filmwork.id = ANY(%s::uuid[])
                     GROUP BY filmwork.id
                     ORDER BY updated_at
-                    """.format(
-                        movie,
-                    ),
+                    """,
+                    (batch,),
                 )
-                film_work_data = dict(pg_cursor.fetchall()[0])
-                yield film_work_data
+                for film_work_data in pg_cursor:
+                    yield dict(film_work_data)
+
+    @backoff.on_exception(
+        backoff.expo,
+        (
+            OperationalError,
+            InterfaceError,
+            ConnectionDoesNotExist,
+            ConnectionFailure,
+            ConnectionException,
+        ),
+    )
+    def extract_similar_data(self, movies: list) -> list[dict]:
+        """
+        Compute lists of similar films for movies from the PostgreSQL database.
+
+        Every list costs a scan of films sharing genres or persons with the
+        movie, so lists are computed apart from indexing, a batch at a time.
+
+        Args:
+            movies: list of movies ids to compute similar films for.
+
+        Returns:
+            Movies id with its similar films, films missing in the database
+            are left out.
+        """
+        with self.pg_connection.cursor() as pg_cursor:
+            pg_cursor.execute(
+                SIMILAR_QUERY,
+                {'movies': movies, 'similar_count': self.similar_count},
+            )
+            return [dict(row) for row in pg_cursor.fetchall()]
@@ -3,6 +3,7 @@
 
 import json
 import logging
+import time
 from dataclasses import dataclass
 from typing import Generator
 
@@ -15,6 +16,13 @@ from redis import Redis
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CACHE_INVALIDATION_CHANNEL = 'cache_invalidation'
+CACHE_TAG_PREFIX = 'tag:'
+CACHE_DOCUMENT_PREFIX = 'document:'
+# Marks tags and documents reindexed moments ago, API requests that read
+# them before do not put them back to the cache while the mark lives.
+CACHE_REINDEXED_PREFIX = 'reindexed:'
+
 
 class ElasticIndex(BaseModel):
     """Class for elasticsearch index settings validation."""
@@ -32,16 +40,22 @@ class ElasticLoader:
     redis: Redis
     index_info: FilePath
     chunk_size: int
+    cache_redis: Redis
+    thread_count: int = 4
+    max_chunk_bytes: int = 100 * 1024 * 1024
+    reindexed_expire: int = 30
 
-    @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
-    def create_index(self) -> None:
-        """Create Elasticsearch index if it does not exist."""
+    def read_index_info(self) -> ElasticIndex:
         with open(self.index_info, 'r') as file:
             data = json.load(
                 file,
             )
+        return ElasticIndex.parse_obj(data)
 
-        index = ElasticIndex.parse_raw(str(data).replace("'", '"'))
+    @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
+    def create_index(self) -> None:
+        """Create Elasticsearch index if it does not exist."""
+        index = self.read_index_info()
 
         try:
             self.elastic.indices.create(
@@ -53,25 +67,120 @@ class ElasticLoader:
             logger.error(transport_error)
 
     @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
-    def load_data(self, movies_data: Generator) -> None:
+    def update_mapping(self) -> None:
+        """Add fields new in the schema to the already created index."""
+        if not self.elastic.indices.exists(index=['movies']):
+            return
+        index = self.read_index_info()
+        try:
+            self.elastic.indices.put_mapping(
+                index='movies',
+                body=index.mappings,
+            )
+        except TransportError as transport_error:
+            logger.error(transport_error)
+
+    @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
+    def load_data(self, movies_data: Generator) -> list:
         """
-        Load movies data to Elasticsearch index by chunk.
+        Upsert movies data to Elasticsearch index by chunks in parallel.
 
         Args:
             movies_data: generator - dict of validated data.
 
+        Returns:
+            Ids of the indexed documents, failed ones are logged.
         """
         if not self.elastic.indices.exists(index=['movies']):
             self.create_index()
             logger.info('Index created')
 
-            try:
-                helpers.bulk(
-                    self.elastic,
-                    movies_data,
-                    chunk_size=self.chunk_size,
-                )
-                logger.info('Loaded data to Elasticsearch')
+        indexed_ids = []
+        failed = 0
+        started = time.monotonic()
+        try:
+            for ok, item in helpers.parallel_bulk(
+                self.elastic,
+                movies_data,
+                thread_count=self.thread_count,
+                chunk_size=self.chunk_size,
+                max_chunk_bytes=self.max_chunk_bytes,
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                result = next(iter(item.values()))
+                if ok:
+                    indexed_ids.append(str(result['_id']))
+                else:
+                    failed += 1
+                    logger.error(
+                        'Document %s is not loaded: %s',
+                        result.get('_id'),
+                        result.get('error'),
+                    )
+        finally:
+            elapsed = time.monotonic() - started
+            logger.info(
+                'Loaded %d documents to Elasticsearch, %d failed, '
+                '%.1f docs/sec',
+                len(indexed_ids),
+                failed,
+                len(indexed_ids) / elapsed if elapsed else 0,
+            )
+            if indexed_ids:
+                self.refresh_index()
+            self.invalidate_cache(indexed_ids)
+        return indexed_ids
+
+    def refresh_index(self) -> None:
+        """Make indexed documents searchable before caches are invalidated.
+
+        Otherwise a request right after the invalidation may search the
+        index without them and cache that response again.
+        """
+        try:
+            self.elastic.indices.refresh(index='movies')
+        except (ConnectionError, TransportError) as error:
+            logger.error(error)
+
+    def invalidate_cache(self, ids: list) -> None:
+        """
+        Evict cached documents and API responses containing reindexed movies.
 
-            except Exception as load_error:
-                logger.error(load_error)
+        Args:
+            ids: list - ids of the indexed documents.
+        """
+        invalidated = 0
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start:start + self.chunk_size]
+            tags = [f'{CACHE_TAG_PREFIX}{id}' for id in chunk]
+            documents = [
+                f'{CACHE_DOCUMENT_PREFIX}movies:{id}' for id in chunk
+            ]
+            with self.cache_redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.smembers(tag)
+                keys = set().union(*pipe.execute())
+                # Responses and documents read before the reindex are not
+                # cached again while the marks live.
+                for key in (*tags, *documents):
+                    pipe.set(
+                        f'{CACHE_REINDEXED_PREFIX}{key}',
+                        1,
+                        ex=self.reindexed_expire,
+                    )
+                pipe.delete(*tags, *documents, *keys)
+                if keys:
+                    pipe.publish(
+                        CACHE_INVALIDATION_CHANNEL,
+                        json.dumps(
+                            {
+                                'ids': chunk,
+                                'index': 'movies',
+                                'keys': [key.decode('utf-8') for key in keys],
+                            },
+                        ),
+                    )
+                pipe.execute()
+            invalidated += len(keys)
+        logger.info('Invalidated %d cached responses', invalidated)
@@ -0,0 +1,75 @@
+"""Module for listening to content changes notified by PostgreSQL."""
+
+import json
+import logging
+import select
+from collections import defaultdict
+from dataclasses import dataclass
+from time import monotonic
+
+import psycopg2
+from psycopg2.extensions import connection
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'content_changes'
+
+
+@dataclass
+class ChangeListener:
+    """Class for waiting for changes sent by content tables triggers."""
+
+    dsn: dict
+    debounce: float = 0.2
+    max_delay: float = 1.0
+    pg_connection: connection | None = None
+
+    def connect(self) -> None:
+        """Open a separate connection, LISTEN works out of transactions."""
+        self.close()
+        self.pg_connection = psycopg2.connect(**self.dsn)
+        self.pg_connection.autocommit = True
+        with self.pg_connection.cursor() as pg_cursor:
+            pg_cursor.execute(f'LISTEN {CHANNEL}')
+        logger.info('Listening for changes on %s channel', CHANNEL)
+
+    def close(self) -> None:
+        if self.pg_connection is not None and not self.pg_connection.closed:
+            self.pg_connection.close()
+        self.pg_connection = None
+
+    def wait(self, timeout: float) -> dict[str, set]:
+        """
+        Wait for changes and collect them in a batch.
+
+        After the first notification changes are collected while they keep
+        coming more often than the debounce time, but not longer than the
+        max delay.
+
+        Args:
+            timeout: float - seconds to wait for the first notification.
+
+        Returns:
+            Changed rows ids by table name, empty dict on timeout.
+        """
+        if self.pg_connection is None or self.pg_connection.closed:
+            self.connect()
+        changes = defaultdict(set)
+        if not select.select([self.pg_connection], [], [], timeout)[0]:
+            return changes
+        deadline = monotonic() + self.max_delay
+        while True:
+            self.pg_connection.poll()
+            while self.pg_connection.notifies:
+                notify = self.pg_connection.notifies.pop(0)
+                try:
+                    change = json.loads(notify.payload)
+                    changes[change['table']].add(change['id'])
+                except (ValueError, KeyError, TypeError):
+                    logger.error('Wrong notification %s', notify.payload)
+            wait_more = min(self.debounce, deadline - monotonic())
+            if wait_more <= 0 or not select.select(
+                [self.pg_connection], [], [], wait_more,
+            )[0]:
+                return changes
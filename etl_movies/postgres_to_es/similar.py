@@ -0,0 +1,136 @@
+"""Module for refreshing precomputed lists of similar films."""
+
+import logging
+from dataclasses import dataclass
+from time import time
+
+from extract import ExtractorFromPostgres
+from load import ElasticLoader
+from redis import Redis
+from transform import Transformer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Movies by the unix time their lists are due, movies reindexed since the
+# last refresh of their lists and films listing a movie, by movie id.
+SIMILAR_QUEUE = 'similar_refresh'
+SIMILAR_CHANGED = 'similar_changed'
+SIMILAR_LISTED_PREFIX = 'similar_listed:'
+
+
+@dataclass
+class SimilarRefresher:
+    """
+    Class for recomputing lists of similar films apart from indexing.
+
+    A list is refreshed halfway through max_age, the API searches similar
+    films itself for older lists. A reindexed movie queues films listing it,
+    so their titles and ratings follow it, and films of its own list, so a
+    new movie gets into their lists.
+    """
+
+    extractor: ExtractorFromPostgres
+    transformer: Transformer
+    loader: ElasticLoader
+    redis: Redis
+    batch_size: int = 500
+    max_age: int = 86400
+
+    def schedule(self, movies_id: list) -> None:
+        """
+        Queue lists of reindexed or deleted movies.
+
+        Indexing drops the stored list of a movie, and lists of other films
+        holding a deleted movie are refreshed once it is found missing.
+
+        Args:
+            movies_id: list - ids of the indexed or deleted movies.
+        """
+        if not movies_id:
+            return
+        with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(SIMILAR_CHANGED, *movies_id)
+            pipe.zadd(SIMILAR_QUEUE, {movie: time() for movie in movies_id})
+            pipe.execute()
+
+    def refresh(self) -> None:
+        """Recompute one batch of lists that are due."""
+        now = time()
+        movies_id = [
+            movie.decode('utf-8')
+            for movie in self.redis.zrangebyscore(
+                SIMILAR_QUEUE,
+                '-inf',
+                now,
+                start=0,
+                num=self.batch_size,
+            )
+        ]
+        if not movies_id:
+            return
+        similar_data = self.extractor.extract_similar_data(movies_id)
+        updated_ids = set(
+            self.loader.load_data(
+                self.transformer.prepare_similar_for_es(
+                    similar_data,
+                    int(now),
+                ),
+            ),
+        )
+        found = {row['filmwork_id'] for row in similar_data}
+        # Movies deleted from PostgreSQL are dropped from lists of others.
+        missing = set(movies_id) - found
+        changed = missing | {
+            movie
+            for movie, is_changed in zip(
+                movies_id,
+                self.redis.smismember(SIMILAR_CHANGED, movies_id),
+            )
+            if is_changed
+        }
+        listed_keys = [f'{SIMILAR_LISTED_PREFIX}{movie}' for movie in changed]
+        with self.redis.pipeline(transaction=False) as pipe:
+            for key in listed_keys:
+                pipe.smembers(key)
+            neighbours = {
+                movie.decode('utf-8')
+                for movie in set().union(*pipe.execute())
+            }
+        for row in similar_data:
+            if row['filmwork_id'] in changed:
+                neighbours.update(film['uuid'] for film in row['similar'])
+        neighbours -= set(movies_id)
+
+        with self.redis.pipeline(transaction=False) as pipe:
+            if changed:
+                pipe.delete(*listed_keys)
+                pipe.srem(SIMILAR_CHANGED, *changed)
+            if missing:
+                pipe.zrem(SIMILAR_QUEUE, *missing)
+            for row in similar_data:
+                if row['filmwork_id'] not in updated_ids:
+                    continue
+                for film in row['similar']:
+                    pipe.sadd(
+                        f'{SIMILAR_LISTED_PREFIX}{film["uuid"]}',
+                        row['filmwork_id'],
+                    )
+            if found:
+                pipe.zadd(
+                    SIMILAR_QUEUE,
+                    {movie: now + self.max_age // 2 for movie in found},
+                )
+            if neighbours:
+                pipe.zadd(
+                    SIMILAR_QUEUE,
+                    {movie: now for movie in neighbours},
+                    lt=True,
+                )
+            pipe.execute()
+        logger.info(
+            'Refreshed similar films of %d movies, %d dropped, %d queued',
+            len(updated_ids),
+            len(missing),
+            len(neighbours),
+        )
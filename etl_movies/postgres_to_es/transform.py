@@ -1,6 +1,7 @@
 """Module for transforming movies data to relevant format for Elasticsearch."""
 
 
+import json
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime
@@ -61,8 +62,8 @@ class Transformer:
         Yields:
             Dictionary mapping movies data for in Elasticsearch.
         """
-        movie = {}
         for film in self.get_transformed_movies(movies_data):
+            movie = {}
             movie['uuid'] = film['filmwork_id']
             movie['imdb_rating'] = film['rating']
             # movie['genre'] = [genre['genre_name'] for genre in film['genres']]
@@ -113,9 +114,66 @@ class Transformer:
                 for person in film['persons']
                 if person['person_role'] == 'writer'
             ]
+            movie['rendered'] = self.render(movie)
 
             yield {
                 '_index': 'movies',
                 '_id': movie['uuid'],
                 '_source': movie,
             }
+
+    @staticmethod
+    def prepare_similar_for_es(
+        similar_data: list[dict],
+        updated_at: int,
+    ) -> Generator:
+        """
+        Transform similar films lists to partial updates of movies.
+
+        Args:
+            similar_data: list - movies ids with their similar films
+            updated_at: int - unix time the lists are computed at
+
+        Yields:
+            Dictionary mapping an update of the movie document.
+        """
+        for row in similar_data:
+            yield {
+                '_op_type': 'update',
+                '_index': 'movies',
+                '_id': row['filmwork_id'],
+                'doc': {
+                    'similar': row['similar'],
+                    'similar_updated_at': updated_at,
+                },
+            }
+
+    @staticmethod
+    def render(movie: dict) -> str:
+        """
+        Render the movie exactly as the API responds with it.
+
+        Args:
+            movie: dict - movie document.
+
+        Returns:
+            JSON of the film details response.
+        """
+        return json.dumps(
+            {
+                'uuid': movie['uuid'],
+                'title': movie['title'],
+                'imdb_rating': movie['imdb_rating'],
+                'description': movie['description'],
+                'genre': [
+                    {'name': genre['name'], 'uuid': genre['uuid']}
+                    for genre in movie['genre']
+                ],
+                'actors': movie['actors'],
+                'writers': movie['writers'],
+                'directors': movie['directors'],
+            },
+            default=str,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
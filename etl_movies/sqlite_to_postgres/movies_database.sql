@@ -62,4 +62,13 @@ CREATE UNIQUE INDEX film_work_person_role_idx ON content.person_film_work (film_
 
 CREATE UNIQUE INDEX film_work_genre_idx ON content.genre_film_work (film_work_id, genre_id);
 
-CREATE INDEX ON content.film_work (creation_date, rating);
\ No newline at end of file
+CREATE INDEX ON content.film_work (creation_date, rating);
+CREATE INDEX ON content.film_work (updated_at, id);
+
+CREATE INDEX ON content.genre (updated_at, id);
+
+CREATE INDEX ON content.person (updated_at, id);
+
+CREATE INDEX ON content.person_film_work (person_id);
+
+CREATE INDEX ON content.genre_film_work (genre_id);
@@ -0,0 +1,67 @@
+-- Notify ETL processes about changed rows right after commit,
+-- payload is {"table": <table name>, "id": <row id>}.
+CREATE OR REPLACE FUNCTION content.notify_content_change() RETURNS trigger AS $$
+DECLARE
+    changed record;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    PERFORM pg_notify(
+        'content_changes',
+        json_build_object('table', TG_TABLE_NAME, 'id', changed.id)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rows of link tables change the documents they link, trigger arguments
+-- are pairs of the table name and the column with its row id.
+CREATE OR REPLACE FUNCTION content.notify_link_change() RETURNS trigger AS $$
+DECLARE
+    changed jsonb;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := to_jsonb(OLD);
+    ELSE
+        changed := to_jsonb(NEW);
+    END IF;
+    FOR i IN 0 .. TG_NARGS - 1 BY 2 LOOP
+        PERFORM pg_notify(
+            'content_changes',
+            json_build_object(
+                'table', TG_ARGV[i],
+                'id', changed ->> TG_ARGV[i + 1]
+            )::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER film_work_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON content.film_work
+    FOR EACH ROW EXECUTE FUNCTION content.notify_content_change();
+
+CREATE OR REPLACE TRIGGER genre_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON content.genre
+    FOR EACH ROW EXECUTE FUNCTION content.notify_content_change();
+
+CREATE OR REPLACE TRIGGER person_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON content.person
+    FOR EACH ROW EXECUTE FUNCTION content.notify_content_change();
+
+CREATE OR REPLACE TRIGGER genre_film_work_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON content.genre_film_work
+    FOR EACH ROW EXECUTE FUNCTION content.notify_link_change(
+        'film_work', 'film_work_id'
+    );
+
+-- Persons documents list their films, so persons are notified as well.
+CREATE OR REPLACE TRIGGER person_film_work_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON content.person_film_work
+    FOR EACH ROW EXECUTE FUNCTION content.notify_link_change(
+        'film_work', 'film_work_id', 'person', 'person_id'
+    );
@@ -2,7 +2,6 @@
 
 import json
 import logging
-import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Generator
@@ -31,6 +30,7 @@ class ExtractorFromPostgres:
 
     tables = [
         'person',
+        'film_work',
     ]
 
     @backoff.on_exception(
@@ -55,39 +55,23 @@ class ExtractorFromPostgres:
             None if tables have not been updated.
         """
         with self.pg_connection.cursor() as pg_cursor:
-            updates_in_tables = {}
             logger.info('Checking tables for updates')
-            for table in self.tables:
-                pg_cursor.execute(
-                    f"""
-                    SELECT id, updated_at FROM {table}
-                    WHERE updated_at > TIMESTAMP '{last_checked}'
-                    ORDER BY updated_at
-                    """,
-                )
-                updates_in_tables[table] = dict(pg_cursor.fetchall())
-            persons = [item for item in updates_in_tables['person'].keys()]
-
-            if persons:
-                pg_cursor.execute(
-                    """
-                    SELECT id FROM person WHERE person.id IN {0}
-                    """.format(
-                        re.sub(
-                            r',\s*\)',
-                            ')',
-                            str(tuple(persons)),
-                        ),
-                    ),
-                )
-
-            persons_update = [
+            # Titles and ratings of films are kept in persons documents.
+            pg_cursor.execute(
+                """
+                SELECT id FROM person
+                WHERE updated_at > %(last_checked)s
+                UNION
+                SELECT person_film_work.person_id FROM person_film_work
+                JOIN film_work ON film_work.id = person_film_work.film_work_id
+                WHERE film_work.updated_at > %(last_checked)s
+                """,
+                {'last_checked': last_checked},
+            )
+            persons_need_to_update = {
                 person[0] for person in pg_cursor.fetchall()
-            ]
+            }
 
-        persons_need_to_update = set().union(
-            persons_update,
-        )
         self.redis.set(
             'person_last_checked',
             json.dumps(
@@ -108,6 +92,52 @@ class ExtractorFromPostgres:
         logger.info('There are no persons for update')
         return None
 
+    @backoff.on_exception(
+        backoff.expo,
+        (
+            OperationalError,
+            InterfaceError,
+            ConnectionDoesNotExist,
+            ConnectionFailure,
+            ConnectionException,
+        ),
+    )
+    def find_notified_updates(self, changes: dict[str, set]) -> set:
+        """
+        Save persons ids affected by notified changes to Redis.
+
+        Args:
+            changes: dict - changed rows ids by table name.
+
+        Returns:
+            Set of persons ids that need to be updated at the moment.
+        """
+        params = {
+            table: list(changes.get(table, ())) for table in self.tables
+        }
+        if not any(params.values()):
+            return set()
+        with self.pg_connection.cursor() as pg_cursor:
+            pg_cursor.execute(
+                """
+                SELECT id::text FROM person
+                WHERE id = ANY(%(person)s::uuid[])
+                UNION
+                SELECT person_id::text FROM person_film_work
+                WHERE film_work_id = ANY(%(film_work)s::uuid[])
+                """,
+                params,
+            )
+            persons_need_to_update = {row[0] for row in pg_cursor.fetchall()}
+
+        if persons_need_to_update:
+            self.redis.sadd('persons_need_to_update', *persons_need_to_update)
+            logger.info(
+                'There are %d persons changed',
+                len(persons_need_to_update),
+            )
+        return persons_need_to_update
+
     @backoff.on_exception(
         backoff.expo,
         (
@@ -123,29 +153,50 @@ class ExtractorFromPostgres:
         persons: list,
     ) -> Generator:
         """
-        Extract whole movies information from the PostgreSQL database.
+        Extract whole persons information from the PostgreSQL database.
 
         Args:
-            movies: list of movies ids to extract from the PostgreSQL database.
+            persons: list of persons ids to extract from the PostgreSQL
+                database, read with one query.
 
         Yields:
-            Dictionary mapping movies information.
+            Dictionary mapping persons information, persons missing in the
+            database are left out.
         """
         with self.pg_connection.cursor() as pg_cursor:
-            for person in persons:
-                pg_cursor.execute(
-                    """
-                    SELECT 
-                        p.id, 
-                        p.full_name, 
-                        COALESCE(CONCAT_WS(',', ARRAY_AGG(DISTINCT pfw.film_work_id)), '') AS film_work_ids
-                    FROM person p
-                    LEFT JOIN person_film_work pfw ON p.id = pfw.person_id
-                    WHERE p.id = '{0}'
-                    GROUP BY p.id, p.full_name
-                    """.format(
-                        person,
-                    ),
-                )
-                person_data = dict(pg_cursor.fetchall()[0])
-                yield person_data
+            pg_cursor.execute(
+                """
+                SELECT
+                    p.id,
+                    p.full_name,
+                    COALESCE(CONCAT_WS(',', ARRAY_AGG(DISTINCT person_films.film_work_id)), '') AS film_work_ids,
+                    COALESCE(
+                        json_agg(
+                            json_build_object(
+                                'uuid', fw.id,
+                                'title', fw.title,
+                                'imdb_rating', fw.rating,
+                                'roles', person_films.roles
+                            )
+                            ORDER BY fw.id
+                        ) FILTER (WHERE fw.id IS NOT NULL),
+                        '[]'
+                    ) AS films
+                FROM person p
+                LEFT JOIN (
+                    SELECT
+                        person_id,
+                        film_work_id,
+                        ARRAY_AGG(DISTINCT role) AS roles
+                    FROM person_film_work
+                    WHERE person_id = ANY(%(persons)s::uuid[])
+                    GROUP BY person_id, film_work_id
+                ) AS person_films ON person_films.person_id = p.id
+                LEFT JOIN film_work fw ON fw.id = person_films.film_work_id
+                WHERE p.id = ANY(%(persons)s::uuid[])
+                GROUP BY p.id, p.full_name
+                """,
+                {'persons': list(persons)},
+            )
+            for person_data in pg_cursor.fetchall():
+                yield dict(person_data)
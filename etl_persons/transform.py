@@ -1,6 +1,7 @@
 """Module for transforming persons data to relevant format for Elasticsearch."""
 
 
+import json
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime
@@ -12,6 +13,9 @@ from redis import Redis
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Order of roles in the API responses.
+ROLES = ('actor', 'writer', 'director')
+
 
 @dataclass
 class Person:
@@ -20,6 +24,7 @@ class Person:
     full_name: str
     id: uuid.UUID
     film_work_ids: list[dict]
+    films: list[dict]
 
 
 @dataclass
@@ -58,14 +63,49 @@ class Transformer:
         Yields:
             Dictionary mapping persons data for in Elasticsearch.
         """
-        person = {}
         for data in self.get_transformed_persons(persons_data):
+            person = {}
             person['uuid'] = data['id']
             person['full_name'] = data['full_name']
             person['film_work_ids'] = [fw_id for fw_id in data['film_work_ids'].strip('{}').split(',')]
+            person['films'] = [
+                {
+                    **film,
+                    'roles': [
+                        role for role in ROLES if role in film['roles']
+                    ],
+                }
+                for film in data['films']
+            ]
+            person['rendered'] = self.render(person)
 
             yield {
                 '_index': 'persons',
                 '_id': person['uuid'],
                 '_source': person,
             }
+
+    @staticmethod
+    def render(person: dict) -> str:
+        """
+        Render the person exactly as the API responds with it.
+
+        Args:
+            person: dict - person document.
+
+        Returns:
+            JSON of the person details response.
+        """
+        return json.dumps(
+            {
+                'uuid': person['uuid'],
+                'full_name': person['full_name'],
+                'films': [
+                    {'uuid': film['uuid'], 'roles': film['roles']}
+                    for film in person['films']
+                ],
+            },
+            default=str,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
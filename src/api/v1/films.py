@@ -1,13 +1,21 @@
-import asyncio
 from http import HTTPStatus
+from time import time
 from typing import List, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from api.v1.schemas import Film, FilmBase
-from api.v1.utils import PaginateQueryParams
+from api.v1.schemas import Film, FilmBase, Page
+from api.v1.utils import (
+    PaginateQueryParams,
+    encode_cursor,
+    get_cursor,
+    rendered_response,
+    source_fields,
+)
 from cache.redis_cache import cache
+from core.config import SIMILAR_COUNT, SIMILAR_MAX_AGE
+from models.cursor import Cursor
 from services.base_service import MovieService
 from services.storage_service import get_film_service
 from auth.jwt import check_auth
@@ -17,11 +25,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def as_list(value) -> list:
+    """Field of the model, which holds one object or a list, as a list."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
 @router.get(
     '/{film_id}/similar',
     summary="Похожие фильмы",
-    description="Список похожих фильмов по жанру",
-    response_description="Похожие фильму по жанру",
+    description="Список похожих фильмов по общим жанрам и персонам",
+    response_description="Похожие фильмы",
     tags=["Похожие фильмы"],
     response_model=List[FilmBase],
 )
@@ -34,32 +49,41 @@ async def similar_films(
         movie_service: MovieService = Depends(get_film_service),
 ) -> list[FilmBase]:
     data_from_storage = await movie_service.get_by_id(film_id)
-    film = Film(**data_from_storage)
-    if not film:
+    if not data_from_storage:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='film not found',
         )
-    genre_ids = [str(genre.uuid) for genre in film.genre]
-    list_data_from_storage = await asyncio.gather(
-        *[
-            movie_service.search_data(
-                sort='imdb_rating',
-                parameters=parameters,
-                filter=genre_id,
-            )
-            for genre_id in genre_ids
-        ],
+    similars = data_from_storage.get('similar')
+    updated_at = data_from_storage.get('similar_updated_at')
+    start = parameters.page_number * parameters.page_size
+    end = start + parameters.page_size
+    # Precomputed by ETL, only the top SIMILAR_COUNT films of the list are
+    # kept. Lists ETL failed to refresh in time and pages past a full list
+    # are searched, the search ranks films as ETL does.
+    if similars is not None and updated_at and (
+        time() - updated_at < SIMILAR_MAX_AGE
+    ) and (end <= len(similars) or len(similars) < SIMILAR_COUNT):
+        return [FilmBase(**film) for film in similars[start:end]]
+    film = Film(**data_from_storage)
+    genre_ids = [str(genre.uuid) for genre in as_list(film.genre)]
+    person_ids = list(
+        {
+            str(person.uuid)
+            for persons in (film.actors, film.writers, film.directors)
+            for person in as_list(persons)
+        }
+    )
+    if not genre_ids and not person_ids:
+        return []
+    similars = await movie_service.get_similar(
+        film_id=film_id,
+        genre_ids=genre_ids,
+        person_ids=person_ids,
+        parameters=parameters,
+        fields=source_fields(FilmBase),
     )
-    similar_ids = []
-    similars = []
-    for group in list_data_from_storage:
-        for film in group:
-            if film.get('uuid') not in similar_ids:
-                similar_ids.append(film.get('uuid'))
-                similars.append(film)
-    results = [FilmBase(**film) for film in similars]
-    return sorted(results, key=lambda film: film.imdb_rating, reverse=True)
+    return [FilmBase(**film) for film in similars]
 
 
 @router.get(
@@ -68,7 +92,7 @@ async def similar_films(
     description="Полнотекстовый поиск по кинопроизведениям",
     response_description="Название и рейтинг фильма",
     tags=["Полнотекстовый поиск"],
-    response_model=List[FilmBase],
+    response_model=Union[List[FilmBase], Page[FilmBase]],
 )
 @check_auth(endpoint_permission='subscriber')
 @cache
@@ -76,11 +100,24 @@ async def search_films(
         request: Request,
         query: str = Query(default=None),
         paginate_query_params: PaginateQueryParams = Depends(),
+        cursor: Cursor | None = Depends(get_cursor),
         movie_service: MovieService = Depends(get_film_service),
-) -> List[FilmBase]:
+) -> List[FilmBase] | Page[FilmBase]:
+    if cursor is not None:
+        films, next_cursor = await movie_service.search_page(
+            query=query,
+            parameters=paginate_query_params,
+            cursor=cursor,
+            fields=source_fields(FilmBase),
+        )
+        return Page[FilmBase](
+            items=[FilmBase(**film) for film in films],
+            next_cursor=encode_cursor(next_cursor),
+        )
     films = await movie_service.search_data(
         query=query,
         parameters=paginate_query_params,
+        fields=source_fields(FilmBase),
     )
     if not films:
         raise HTTPException(
@@ -95,7 +132,7 @@ async def search_films(
     description="Кинопроизведения",
     response_description="Список кинопроизведений",
     tags=["Кинопроизведения"],
-    response_model=List[FilmBase],
+    response_model=Union[List[FilmBase], Page[FilmBase]],
 )
 @check_auth(endpoint_permission='subscriber')
 @cache
@@ -106,12 +143,26 @@ async def films(
         ),
         parameters: PaginateQueryParams = Depends(),
         filter_genre: UUID = Query(default=None, alias='genre'),
+        cursor: Cursor | None = Depends(get_cursor),
         movie_service: MovieService = Depends(get_film_service),
-) -> List[FilmBase]:
+) -> List[FilmBase] | Page[FilmBase]:
+    if cursor is not None:
+        films, next_cursor = await movie_service.search_page(
+            parameters=parameters,
+            cursor=cursor,
+            sort=sort,
+            filter=filter_genre,
+            fields=source_fields(FilmBase),
+        )
+        return Page[FilmBase](
+            items=[FilmBase(**film) for film in films],
+            next_cursor=encode_cursor(next_cursor),
+        )
     films = await movie_service.search_data(
         parameters=parameters,
         sort=sort,
         filter=filter_genre,
+        fields=source_fields(FilmBase),
     )
     return [FilmBase(**film) for film in films]
 
@@ -136,4 +187,7 @@ async def film_details(
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='film not found'
         )
+    rendered = rendered_response(film)
+    if rendered is not None:
+        return rendered
     return Film(**film)
@@ -1,11 +1,17 @@
 from http import HTTPStatus
+from typing import Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 
-from api.v1.schemas import GenreSchema
-from api.v1.utils import PaginateQueryParams
-from cache.redis_cache import cache
+from api.v1.schemas import GenreSchema, Page
+from api.v1.utils import (
+    PaginateQueryParams,
+    encode_cursor,
+    get_cursor,
+    rendered_response,
+)
+from models.cursor import Cursor
 from services.base_service import MovieService
 from services.storage_service import get_genres_service
 from auth.jwt import check_auth
@@ -19,15 +25,24 @@ router = APIRouter()
     description="Жанры",
     response_description="Список жанров",
     tags=["Жанры"],
-    response_model=list[GenreSchema],
+    response_model=Union[list[GenreSchema], Page[GenreSchema]],
 )
 @check_auth(endpoint_permission='subscriber')
-@cache
 async def genre_list(
     request: Request,
     parameters: PaginateQueryParams = Depends(),
+    cursor: Cursor | None = Depends(get_cursor),
     genre_service: MovieService = Depends(get_genres_service),
 ):
+    if cursor is not None:
+        genres, next_cursor = await genre_service.search_page(
+            parameters=parameters,
+            cursor=cursor,
+        )
+        return Page[GenreSchema](
+            items=[GenreSchema(**genre) for genre in genres],
+            next_cursor=encode_cursor(next_cursor),
+        )
     genres = await genre_service.search_data(parameters=parameters)
     if not genres:
         raise HTTPException(
@@ -46,7 +61,6 @@ async def genre_list(
     response_model=GenreSchema,
 )
 @check_auth(endpoint_permission='subscriber')
-@cache
 async def genre_details(
     request: Request,
     genre_id: UUID,
@@ -58,5 +72,7 @@ async def genre_details(
             status_code=HTTPStatus.NOT_FOUND,
             detail='genre not found',
         )
-
+    rendered = rendered_response(genre)
+    if rendered is not None:
+        return rendered
     return GenreSchema(**genre)
@@ -1,52 +1,47 @@
 import asyncio
 from http import HTTPStatus
-from typing import List
+from typing import List, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from api.v1.schemas import Person
-from api.v1.utils import PaginateQueryParams
+from api.v1.schemas import Page, Person
+from api.v1.utils import (
+    PaginateQueryParams,
+    encode_cursor,
+    get_cursor,
+    rendered_response,
+)
 from cache.redis_cache import cache
+from models.cursor import Cursor
 from models.film import Film, FilmBase
 from models.person import PersonWithFilms
 from services.base_service import MovieService
-from services.storage_service import get_film_service, get_persons_service
+from services.data_loader import DataLoader
+from services.storage_service import get_film_loader, get_persons_service
 from auth.jwt import check_auth
 
 router = APIRouter()
 
 
-async def get_film_by_id(
-    film_work_id: UUID,
-    film_service: MovieService,
-    model: Film | FilmBase,
-) -> Film | FilmBase:
-    film_dict_from_storage = await film_service.get_by_id(id=film_work_id)
-    film = model(**film_dict_from_storage)
-    return film
-
-
 async def get_person_related_films(
-    film_service: MovieService,
+    film_loader: DataLoader,
     person: PersonWithFilms,
     model: Film | FilmBase,
 ) -> list:
-    films = []
-    tasks = []
-    for item in person.get('film_work_ids'):
-        task = asyncio.create_task(
-            get_film_by_id(
-                film_work_id=item,
-                film_service=film_service,
-                model=model,
-            )
-        )
-        tasks.append(task)
-
-    for task in asyncio.as_completed(tasks):
-        film = await task
-        films.append(film)
+    if person.get('films') is not None:
+        # Precomputed by ETL, no films have to be loaded.
+        if model == FilmBase:
+            return [FilmBase(**film) for film in person.get('films')]
+        return [
+            dict(uuid=film['uuid'], roles=film['roles'])
+            for film in person.get('films')
+        ]
+
+    films = [
+        model(**film)
+        for film in await film_loader.load_many(person.get('film_work_ids'))
+    ]
 
     if model == FilmBase:
         return films
@@ -76,7 +71,7 @@ async def get_person_related_films(
     description="Поиск участников",
     response_description="Список найденных участников",
     tags=["Полнотекстовый поиск"],
-    response_model=List[Person],
+    response_model=Union[List[Person], Page[Person]],
 )
 @check_auth(endpoint_permission='subscriber')
 @cache
@@ -84,32 +79,52 @@ async def search_persons(
     request: Request,
     query: str = Query(default=None),
     paginate_query_params: PaginateQueryParams = Depends(),
+    cursor: Cursor | None = Depends(get_cursor),
     person_service: MovieService = Depends(get_persons_service),
-    film_service: MovieService = Depends(get_film_service),
+    film_loader: DataLoader = Depends(get_film_loader),
 ):
-    persons = await person_service.search_data(
-        query=query,
-        parameters=paginate_query_params,
-    )
-    if not persons:
+    next_cursor = None
+    if cursor is not None:
+        persons, next_cursor = await person_service.search_page(
+            query=query,
+            parameters=paginate_query_params,
+            cursor=cursor,
+        )
+    else:
+        persons = await person_service.search_data(
+            query=query,
+            parameters=paginate_query_params,
+        )
+    if not persons and cursor is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='persons not found',
         )
-    result = []
-    for person in persons:
-        result.append(
-            Person(
-                uuid=person.get('uuid'),
-                full_name=person.get('full_name'),
-                films=await get_person_related_films(
-                    film_service=film_service,
-                    person=person,
-                    model=Film,
-                ),
+    # Films of all the persons are loaded in one batch, shared ones once.
+    persons_films = await asyncio.gather(
+        *[
+            get_person_related_films(
+                film_loader=film_loader,
+                person=person,
+                model=Film,
             )
+            for person in persons
+        ]
+    )
+    results = [
+        Person(
+            uuid=person.get('uuid'),
+            full_name=person.get('full_name'),
+            films=films,
+        )
+        for person, films in zip(persons, persons_films)
+    ]
+    if cursor is not None:
+        return Page[Person](
+            items=results,
+            next_cursor=encode_cursor(next_cursor),
         )
-    return result
+    return results
 
 
 @router.get(
@@ -126,13 +141,13 @@ async def films_by_person(
     request: Request,
     person_id: UUID,
     person_service: MovieService = Depends(get_persons_service),
-    film_service: MovieService = Depends(get_film_service),
+    film_loader: DataLoader = Depends(get_film_loader),
 ):
     person = await person_service.get_by_id(id=person_id)
     if not person:
         return []
     related_films = await get_person_related_films(
-        film_service=film_service,
+        film_loader=film_loader,
         person=person,
         model=FilmBase,
     )
@@ -153,19 +168,21 @@ async def person_detail(
     request: Request,
     person_id: UUID,
     persons_service: MovieService = Depends(get_persons_service),
-    film_service: MovieService = Depends(get_film_service),
+    film_loader: DataLoader = Depends(get_film_loader),
 ) -> Person:
     person = await persons_service.get_by_id(id=person_id)
     if not person:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='person not found'
         )
-
+    rendered = rendered_response(person)
+    if rendered is not None:
+        return rendered
     return Person(
         uuid=person.get('uuid'),
         full_name=person.get('full_name'),
         films=await get_person_related_films(
-            film_service=film_service,
+            film_loader=film_loader,
             person=person,
             model=Film,
         ),
@@ -1,11 +1,14 @@
-from typing import List, Union
+from typing import Generic, List, TypeVar, Union
 from uuid import UUID
 
 from pydantic import BaseModel
+from pydantic.generics import GenericModel
 
 from models.genre import Genre
 from models.person import PersonBase
 
+ItemT = TypeVar('ItemT')
+
 
 class ObjectModel(BaseModel):
     uuid: UUID
@@ -31,3 +34,10 @@ class GenreSchema(ObjectModel):
 class Person(ObjectModel):
     full_name: str
     films: list
+
+
+class Page(GenericModel, Generic[ItemT]):
+    """Page of cursor pagination, next_cursor is None on the last one."""
+
+    items: list[ItemT]
+    next_cursor: str | None
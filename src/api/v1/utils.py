@@ -1,4 +1,9 @@
-from fastapi import Query
+from http import HTTPStatus
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+
+from models.cursor import Cursor
 
 
 class PaginateQueryParams:
@@ -22,3 +27,40 @@ class PaginateQueryParams:
     ):
         self.page_number = page_number
         self.page_size = page_size
+
+
+def source_fields(model: type[BaseModel]) -> list[str]:
+    """Document fields the response model is built from."""
+    return list(model.__fields__)
+
+
+def get_cursor(
+    cursor: str | None = Query(
+        None,
+        title="Cursor of the page.",
+        description="Turns on cursor pagination, pass an empty value for "
+        "the first page and next_cursor of the response for the next one",
+    ),
+) -> Cursor | None:
+    if cursor is None:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail='invalid cursor'
+        )
+
+
+def encode_cursor(cursor: Cursor | None) -> str | None:
+    return cursor.encode() if cursor is not None else None
+
+
+def rendered_response(document: dict) -> Response | None:
+    """Response with JSON rendered by ETL, None for older documents."""
+    if document.get('rendered') is None:
+        return None
+    return Response(
+        content=document['rendered'],
+        media_type='application/json',
+    )
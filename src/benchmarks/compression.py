@@ -0,0 +1,47 @@
+"""Benchmark of cached payloads compression.
+
+Run from the src directory: python -m benchmarks.compression
+"""
+
+import timeit
+
+import orjson
+
+from benchmarks.fixtures import payloads
+from cache.compression import Compressor, lz4, zstandard
+
+ROUNDS = 200
+
+
+def main() -> None:
+    codecs = ['none']
+    if zstandard is not None:
+        codecs.append('zstd')
+    if lz4 is not None:
+        codecs.append('lz4')
+    print(
+        f'{"payload":<26}{"codec":<6}{"size, B":>10}{"stored, B":>11}'
+        f'{"ratio":>8}{"encode, us":>12}{"decode, us":>12}'
+    )
+    for name, payload in payloads().items():
+        data = orjson.dumps(payload)
+        for codec in codecs:
+            compressor = Compressor(codec=codec, threshold=0)
+            stored = compressor.compress(data)
+            assert compressor.decompress(stored) == data
+            encode = timeit.timeit(
+                lambda: compressor.compress(data), number=ROUNDS
+            )
+            decode = timeit.timeit(
+                lambda: compressor.decompress(stored), number=ROUNDS
+            )
+            print(
+                f'{name:<26}{codec:<6}{len(data):>10}{len(stored):>11}'
+                f'{len(data) / len(stored):>8.2f}'
+                f'{encode / ROUNDS * 1e6:>12.1f}'
+                f'{decode / ROUNDS * 1e6:>12.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
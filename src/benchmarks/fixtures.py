@@ -0,0 +1,115 @@
+"""Realistic API payloads for the benchmarks."""
+
+import random
+import uuid
+
+WORDS = (
+    'star wars empire strikes back return jedi galaxy far away new hope '
+    'rebel alliance death dark side force sith lord skywalker trilogy'
+).split()
+NAMES = (
+    'Mark Hamill', 'Harrison Ford', 'Carrie Fisher', 'George Lucas',
+    'Irvin Kershner', 'Lawrence Kasdan', 'Leigh Brackett', 'Peter Mayhew',
+    'Anthony Daniels', 'Billy Dee Williams', 'Kenny Baker', 'Frank Oz',
+)
+GENRES = ('Action', 'Adventure', 'Fantasy', 'Sci-Fi', 'Drama', 'Comedy')
+
+
+def text(words: int) -> str:
+    return ' '.join(random.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def persons(count: int) -> list[dict]:
+    return [
+        {'uuid': str(uuid.uuid4()), 'full_name': random.choice(NAMES)}
+        for _ in range(count)
+    ]
+
+
+def film() -> dict:
+    return {
+        'uuid': str(uuid.uuid4()),
+        'title': text(4),
+        'imdb_rating': round(random.uniform(1, 10), 1),
+        'description': text(60),
+        'genre': [
+            {'uuid': str(uuid.uuid4()), 'name': name}
+            for name in random.sample(GENRES, 3)
+        ],
+        'actors': persons(12),
+        'writers': persons(4),
+        'directors': persons(1),
+    }
+
+
+def film_short() -> dict:
+    return {
+        'uuid': str(uuid.uuid4()),
+        'title': text(4),
+        'imdb_rating': round(random.uniform(1, 10), 1),
+    }
+
+
+def person(films: int) -> dict:
+    return {
+        'uuid': str(uuid.uuid4()),
+        'full_name': random.choice(NAMES),
+        'films': [
+            {'uuid': str(uuid.uuid4()), 'roles': ['actor']}
+            for _ in range(films)
+        ],
+    }
+
+
+def payloads() -> dict[str, object]:
+    """Cached responses of typical endpoints by name."""
+    random.seed(0)
+    return {
+        'film details': film(),
+        'films page, 50 items': [film_short() for _ in range(50)],
+        'films page, 500 items': [film_short() for _ in range(500)],
+        'person details, 40 films': person(40),
+        'persons search, 50 items': [person(10) for _ in range(50)],
+    }
+
+
+def search_response(index: str, sources: list[dict]) -> dict:
+    """Elasticsearch search response with the documents as hits."""
+    return {
+        'took': 3,
+        'timed_out': False,
+        '_shards': {'total': 1, 'successful': 1, 'skipped': 0, 'failed': 0},
+        'hits': {
+            'total': {'value': len(sources), 'relation': 'eq'},
+            'max_score': 1.0,
+            'hits': [
+                {
+                    '_index': index,
+                    '_type': '_doc',
+                    '_id': source['uuid'],
+                    '_score': 1.0,
+                    '_source': source,
+                }
+                for source in sources
+            ],
+        },
+    }
+
+
+def search_responses() -> dict[str, dict]:
+    """Raw responses of typical searches by name."""
+    random.seed(0)
+    return {
+        'films page, 50 hits': search_response(
+            'movies', [film_short() for _ in range(50)]
+        ),
+        'films page, 500 hits': search_response(
+            'movies', [film_short() for _ in range(500)]
+        ),
+        'full films, 50 hits': search_response(
+            'movies', [film() for _ in range(50)]
+        ),
+        'full films, 500 hits': search_response(
+            'movies', [film() for _ in range(500)]
+        ),
+    }
@@ -0,0 +1,44 @@
+"""Benchmark of Elasticsearch client serializers.
+
+Run from the src directory: python -m benchmarks.serializer
+"""
+
+import json
+import timeit
+
+from elasticsearch.serializer import JSONSerializer
+
+from benchmarks.fixtures import search_responses
+from db.serializer import ORJSONSerializer
+
+ROUNDS = 100
+SERIALIZERS = {
+    'json': JSONSerializer(),
+    'orjson': ORJSONSerializer(),
+}
+
+
+def main() -> None:
+    print(
+        f'{"response":<24}{"serializer":<12}{"size, B":>10}'
+        f'{"decode, us":>12}{"encode, us":>12}'
+    )
+    for name, response in search_responses().items():
+        raw = json.dumps(response)
+        for serializer_name, serializer in SERIALIZERS.items():
+            assert serializer.loads(raw) == response
+            decode = timeit.timeit(
+                lambda: serializer.loads(raw), number=ROUNDS
+            )
+            encode = timeit.timeit(
+                lambda: serializer.dumps(response), number=ROUNDS
+            )
+            print(
+                f'{name:<24}{serializer_name:<12}{len(raw):>10}'
+                f'{decode / ROUNDS * 1e6:>12.1f}'
+                f'{encode / ROUNDS * 1e6:>12.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
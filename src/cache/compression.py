@@ -0,0 +1,59 @@
+"""Compression of cached payloads.
+
+Every stored value starts with a one byte header naming its format, so
+entries written with another codec, or before compression was enabled,
+are still readable.
+"""
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+RAW = 0xF0
+ZSTD = 0xF1
+LZ4 = 0xF2
+
+CODECS = ('none', 'zstd', 'lz4')
+
+
+class Compressor:
+    """Compress payloads above the size threshold with the chosen codec."""
+
+    def __init__(self, codec: str = 'none', threshold: int = 1024) -> None:
+        if codec not in CODECS:
+            raise ValueError(f'Unknown compression codec {codec}')
+        if codec == 'zstd' and zstandard is None:
+            raise RuntimeError('zstandard package is required for zstd')
+        if codec == 'lz4' and lz4 is None:
+            raise RuntimeError('lz4 package is required for lz4')
+        self.codec = codec
+        self.threshold = threshold
+        if zstandard is not None:
+            self._zstd_compressor = zstandard.ZstdCompressor()
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if self.codec == 'none' or len(data) < self.threshold:
+            return bytes((RAW,)) + data
+        if self.codec == 'zstd':
+            return bytes((ZSTD,)) + self._zstd_compressor.compress(data)
+        return bytes((LZ4,)) + lz4.frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        header = data[0] if data else None
+        if header == RAW:
+            return data[1:]
+        if header == ZSTD:
+            return self._zstd_decompressor.decompress(data[1:])
+        if header == LZ4:
+            return lz4.frame.decompress(data[1:])
+        # Written before compression support, stored as is.
+        return data
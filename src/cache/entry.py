@@ -0,0 +1,68 @@
+import math
+import random
+import struct
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+
+ENTRY_VERSION = 3
+HEADER = struct.Struct('!BHdd')
+
+
+@dataclass
+class CacheEntry:
+    """Cached payload with the moment it should be refreshed at.
+
+    Stored as a fixed size binary header followed by the payload bytes.
+    The header also keeps how long the payload took to compute and the
+    response status, as not found responses are cached too.
+    """
+
+    payload: bytes
+    stale_at: float
+    delta: float = 0
+    status_code: int = HTTPStatus.OK
+
+    @classmethod
+    def create(
+        cls,
+        payload: bytes,
+        soft_expire: int,
+        delta: float,
+        status_code: int = HTTPStatus.OK,
+    ) -> 'CacheEntry':
+        return cls(
+            payload=payload,
+            stale_at=time.time() + soft_expire,
+            delta=delta,
+            status_code=status_code,
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'CacheEntry | None':
+        """Parse stored bytes, None for entries written in other format."""
+        if len(data) < HEADER.size or data[0] != ENTRY_VERSION:
+            return None
+        _, status_code, stale_at, delta = HEADER.unpack_from(data)
+        return cls(
+            payload=data[HEADER.size:],
+            stale_at=stale_at,
+            delta=delta,
+            status_code=status_code,
+        )
+
+    def pack(self) -> bytes:
+        header = HEADER.pack(
+            ENTRY_VERSION, self.status_code, self.stale_at, self.delta
+        )
+        return header + self.payload
+
+    def is_stale(self, beta: float = 0) -> bool:
+        """Probabilistic early expiration (XFetch).
+
+        The closer the entry is to its stale moment and the longer it takes
+        to compute, the more likely it is to be refreshed ahead of time, so
+        entries created together do not expire together.
+        """
+        early = self.delta * beta * -math.log(1.0 - random.random())
+        return time.time() + early >= self.stale_at
@@ -0,0 +1,55 @@
+"""Eviction of cached responses after their documents were reindexed.
+
+ETL loaders delete the affected keys from Redis and publish them to
+the channel, so every worker drops the same keys from its memory tier.
+"""
+
+import logging
+from typing import Callable
+
+import backoff
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+from services.cache import InMemoryCache
+
+CHANNEL = 'cache_invalidation'
+TAG_PREFIX = 'tag:'
+# Set by ETL on reindex for tags and documents, a response or a document
+# read before it is not cached.
+REINDEXED_PREFIX = 'reindexed:'
+
+
+def collect_tags(payload, tags: set[str]) -> set[str]:
+    """Find uuids of all the documents contained in the response."""
+    if isinstance(payload, dict):
+        for name, value in payload.items():
+            if name == 'uuid' and isinstance(value, str):
+                tags.add(value)
+            else:
+                collect_tags(value, tags)
+    elif isinstance(payload, list):
+        for value in payload:
+            collect_tags(value, tags)
+    return tags
+
+
+@backoff.on_exception(backoff.expo, ConnectionError)
+async def listen_invalidations(
+    redis: Redis,
+    memory: InMemoryCache,
+    on_reindex: Callable[[str], None] | None = None,
+) -> None:
+    """Drop invalidated keys, on_reindex is called with the index name."""
+    async with redis.pubsub() as pubsub:
+        await pubsub.subscribe(CHANNEL)
+        async for message in pubsub.listen():
+            if message['type'] != 'message':
+                continue
+            data = orjson.loads(message['data'])
+            for key in data['keys']:
+                memory.delete(key)
+            logging.info('Invalidated %d cached responses', len(data['keys']))
+            if on_reindex is not None:
+                on_reindex(data.get('index'))
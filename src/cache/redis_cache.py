@@ -1,44 +1,236 @@
-import json
+import asyncio
+import hashlib
 import logging
-import uuid
+import time
 from functools import wraps
+from http import HTTPStatus
+from uuid import UUID
 
-from core.config import REDIS_CACHE_EXPIRE as EXPIRE
+import orjson
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+from api.v1.utils import PaginateQueryParams
+from core.config import (
+    REDIS_CACHE_ENDPOINTS_EXPIRE as ENDPOINTS_EXPIRE,
+    REDIS_CACHE_EXPIRE as EXPIRE,
+    REDIS_CACHE_LOCK_ENABLED as LOCK_ENABLED,
+    REDIS_CACHE_LOCK_EXPIRE as LOCK_EXPIRE,
+    REDIS_CACHE_LOCK_POLL_INTERVAL as LOCK_POLL_INTERVAL,
+    REDIS_CACHE_NEGATIVE_EXPIRE as NEGATIVE_EXPIRE,
+    REDIS_CACHE_SOFT_EXPIRE as SOFT_EXPIRE,
+    REDIS_CACHE_XFETCH_BETA as XFETCH_BETA,
+)
 from .abstract_cache import AbstractBaseCache
-from services.cache import get_cache_service
+from .entry import CacheEntry
+from .invalidation import REINDEXED_PREFIX, TAG_PREFIX, collect_tags
+from .single_flight import SingleFlight
+from services.cache import get_cache_service, get_memory_cache_service
+
+single_flight = SingleFlight()
+
+KEY_PREFIX = 'response:'
+# Free text parameters, their case and surrounding spaces do not matter.
+TEXT_PARAMS = ('query',)
+
+
+def make_key(func, kwargs) -> str:
+    """Build the key from resolved endpoint parameters.
+
+    Defaults are already filled in and the order of query parameters does
+    not matter, so equal requests share one entry however they are written.
+    """
+    params = {}
+    for name, value in kwargs.items():
+        if isinstance(value, PaginateQueryParams):
+            params.update(vars(value))
+        elif isinstance(value, str) and name in TEXT_PARAMS:
+            params[name] = value.strip().casefold() or None
+        elif isinstance(value, BaseModel):
+            params[name] = value.dict()
+        elif value is None or isinstance(value, (str, int, float, UUID)):
+            params[name] = value
+    raw = orjson.dumps(
+        [func.__module__, func.__name__, params],
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return KEY_PREFIX + hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def orjson_default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError
+
+
+def serialize(value) -> bytes:
+    """Encode the endpoint result the same way the response is rendered."""
+    return orjson.dumps(value, default=orjson_default)
+
+
+def get_tags(payload: bytes, kwargs) -> set[str]:
+    """Uuids of the documents in the response and in the request path."""
+    tags = {str(value) for value in kwargs.values() if isinstance(value, UUID)}
+    return collect_tags(orjson.loads(payload), tags)
+
+
+def to_response(entry: CacheEntry) -> Response:
+    """Send cached bytes as is, skipping response model validation."""
+    return Response(
+        content=entry.payload,
+        status_code=entry.status_code,
+        media_type='application/json',
+    )
+
 
+async def wait_for_value(redis: AbstractBaseCache, key: str) -> bytes | None:
+    """Poll Redis while another worker holds the lock for the key."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LOCK_EXPIRE
+    while loop.time() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        value = await redis.get(key)
+        if value:
+            return value
+    return None
+
+
+async def store(
+    key: str,
+    payload: bytes,
+    kwargs,
+    soft_expire: int,
+    expire: int,
+    delta: float,
+    status_code: int = HTTPStatus.OK,
+) -> None:
+    """Save the response in both tiers and tag it with its documents.
 
-class UUIDEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, uuid.UUID):
-            return str(obj)
-        return super().default(obj)
+    A response with documents reindexed moments ago may have been read
+    before the reindex, so it is not saved.
+    """
+    redis: AbstractBaseCache = get_cache_service()
+    entry = CacheEntry.create(payload, soft_expire, delta, status_code).pack()
+    if await redis.set_tagged_unless_marked(
+        key,
+        entry,
+        get_tags(payload, kwargs),
+        TAG_PREFIX,
+        REINDEXED_PREFIX,
+        expire,
+    ):
+        await get_memory_cache_service().set(key, entry, expire)
+
+
+async def compute(
+    func,
+    key: str,
+    args,
+    kwargs,
+    soft_expire: int,
+    expire: int,
+    refresh: bool = False,
+):
+    """Compute the value of a key and store it in both tiers.
+
+    On refresh the stale value is still in Redis, so when another worker
+    holds the lock the computation is just skipped.
+    """
+    redis: AbstractBaseCache = get_cache_service()
+    lock = redis.lock(key, LOCK_EXPIRE) if LOCK_ENABLED else None
+    if lock is not None and not await lock.acquire():
+        if refresh:
+            return None
+        value = await wait_for_value(redis, key)
+        entry = CacheEntry.unpack(value) if value else None
+        if entry is not None:
+            logging.info('CACHE HIT AFTER WAIT')
+            await get_memory_cache_service().set(key, value, expire)
+            return to_response(entry)
+        # The lock holder is too slow or failed, compute the value anyway.
+        lock = None
+    try:
+        started = time.monotonic()
+        try:
+            value = await func(*args, **kwargs)
+        except HTTPException as error:
+            if error.status_code != HTTPStatus.NOT_FOUND:
+                raise
+            # Missing documents are requested again and again by crawlers
+            # and broken links, remember them for a short time.
+            await store(
+                key,
+                orjson.dumps({'detail': error.detail}),
+                kwargs,
+                NEGATIVE_EXPIRE,
+                NEGATIVE_EXPIRE,
+                time.monotonic() - started,
+                error.status_code,
+            )
+            logging.info('CACHE MISS, NOT FOUND')
+            raise
+        if isinstance(value, Response):
+            # Pre-rendered responses are cached as the bytes they send.
+            payload, status_code = value.body, value.status_code
+        else:
+            payload, status_code = serialize(value), HTTPStatus.OK
+        await store(
+            key,
+            payload,
+            kwargs,
+            soft_expire,
+            expire,
+            time.monotonic() - started,
+            status_code,
+        )
+    finally:
+        if lock is not None and await lock.owned():
+            await lock.release()
+    logging.info('CACHE REFRESH' if refresh else 'CACHE MISS')
+    return value
+
+
+def log_refresh_error(task: asyncio.Task) -> None:
+    if task.cancelled() or isinstance(task.exception(), HTTPException):
+        return
+    if task.exception() is not None:
+        logging.error('Cache refresh failed', exc_info=task.exception())
 
 
 def cache(func):
+    soft_expire, expire = ENDPOINTS_EXPIRE.get(
+        func.__name__, (SOFT_EXPIRE, EXPIRE)
+    )
+
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        request = kwargs['request']
+        memory: AbstractBaseCache = get_memory_cache_service()
         redis: AbstractBaseCache = get_cache_service()
-        key = str(request.url.path)
-        if request.query_params:
-            key = '?'.join([key, str(request.query_params)])
-        value = await redis.get(key)
+        key = make_key(func, kwargs)
+        value = await memory.get(key)
         if value:
-            logging.info('CACHE HIT')
-            value_json = value.decode('utf-8')
-            value_dict = json.loads(value_json)
-            return value_dict
-        value = await func(*args, **kwargs)
-        try:
-            await redis.set(key, value.json(), EXPIRE)
-        except:
-            serialized_value = json.dumps(
-                [dict(v) for v in value if not isinstance(v, uuid.UUID)],
-                cls=UUIDEncoder,
-            )
-            await redis.set(key, serialized_value.encode('utf-8'), EXPIRE)
-        logging.info('CACHE MISS')
-        return value
+            logging.info('MEMORY CACHE HIT')
+        else:
+            value, ttl = await redis.get_with_ttl(key)
+            if value:
+                logging.info('CACHE HIT')
+                # The memory copy must not outlive the Redis entry.
+                await memory.set(key, value, ttl or expire)
+        entry = CacheEntry.unpack(value) if value else None
+        if entry is not None:
+            if entry.is_stale(XFETCH_BETA):
+                # Serve the stale value at once, refresh it in background.
+                task = single_flight.start(
+                    key,
+                    lambda: compute(
+                        func, key, args, kwargs, soft_expire, expire, True
+                    ),
+                )
+                task.add_done_callback(log_refresh_error)
+            return to_response(entry)
+        return await single_flight.do(
+            key,
+            lambda: compute(func, key, args, kwargs, soft_expire, expire),
+        )
 
     return wrapper
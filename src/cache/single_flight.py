@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Coalesces concurrent computations of the same key in one worker.
+
+    The first caller starts the computation as a separate task, the others
+    await the same task, so the value is computed once however many
+    requests ask for it at the same time.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def start(
+        self, key: str, func: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        """Return the running computation of the key or start a new one."""
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.create_task(func())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        return call
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        # A cancelled request must not cancel the computation for the others.
+        return await asyncio.shield(self.start(key, func))
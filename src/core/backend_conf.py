@@ -1,7 +1,9 @@
 """Module for validating configuration parameters."""
 
+from typing import Literal
+
 from dotenv import load_dotenv
-from pydantic import BaseSettings
+from pydantic import BaseSettings, validator
 
 load_dotenv()
 
@@ -38,6 +40,9 @@ class ElasticSettings(BaseSettings):
     PORT: int
     USERNAME: str
     PASSWORD: str
+    MGET_BATCH_SIZE: int = 500
+    CURSOR_PIT: bool = False
+    CURSOR_PIT_KEEP_ALIVE: str = '1m'
 
     class Config:
         """Configuration class for correct env variables insertion."""
@@ -52,6 +57,27 @@ class RedisSettings(BaseSettings):
     API_HOST: str
     PORT: int
     EXPIRE: int
+    SOFT_EXPIRE: int = 60
+    XFETCH_BETA: float = 1.0
+    NEGATIVE_EXPIRE: int = 30
+    DOCUMENT_EXPIRE: int = 3600
+    ENDPOINTS_EXPIRE: dict[str, tuple[int, int]] = {}
+    COMPRESSION: Literal['none', 'zstd', 'lz4'] = 'none'
+    COMPRESSION_THRESHOLD: int = 1024
+    LOCK_ENABLED: bool = False
+    LOCK_EXPIRE: float = 5.0
+    LOCK_POLL_INTERVAL: float = 0.05
+
+    @validator('ENDPOINTS_EXPIRE')
+    def check_soft_before_hard(cls, value):
+        """An entry has to turn stale before it expires."""
+        for endpoint, (soft_expire, expire) in value.items():
+            if soft_expire >= expire:
+                raise ValueError(
+                    f'{endpoint}: soft expire {soft_expire} must be less '
+                    f'than expire {expire}'
+                )
+        return value
 
     class Config:
         """Configuration class for correct env variables insertion."""
@@ -60,6 +86,46 @@ class RedisSettings(BaseSettings):
         alias_generator = to_lower
 
 
+class MemoryCacheSettings(BaseSettings):
+    """Configuration for in-process cache in front of Redis."""
+
+    MAX_ENTRIES: int = 1024
+    MAX_BYTES: int = 64 * 1024 * 1024
+    EXPIRE: int = 10
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'MEMORY_CACHE_'
+        alias_generator = to_lower
+
+
+class GenresReplicaSettings(BaseSettings):
+    """Configuration for in-process copy of the genres index."""
+
+    REFRESH_INTERVAL: int = 300
+    MAX_SIZE: int = 10000
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'GENRES_REPLICA_'
+        alias_generator = to_lower
+
+
+class SimilarSettings(BaseSettings):
+    """Configuration for lists of similar films precomputed by ETL."""
+
+    MAX_AGE: int = 86400
+    COUNT: int = 50
+
+    class Config:
+        """Configuration class for correct env variables insertion."""
+
+        env_prefix = 'SIMILAR_'
+        alias_generator = to_lower
+
+
 class JwtSettings(BaseSettings):
     """Configuration for jwt"""
 
@@ -77,5 +143,8 @@ class Settings(BaseSettings):
 
     ELASTICSEARCH = ElasticSettings()
     REDIS = RedisSettings()
+    MEMORY_CACHE = MemoryCacheSettings()
+    GENRES_REPLICA = GenresReplicaSettings()
+    SIMILAR = SimilarSettings()
     PROJECT = ProjectSettings()
     JWT = JwtSettings()
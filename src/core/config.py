@@ -17,11 +17,41 @@ CACHE_SERVICE_NAME = configs.PROJECT.CACHE_SERVICE_NAME
 REDIS_CACHE_HOST = configs.REDIS.API_HOST
 REDIS_CACHE_PORT = configs.REDIS.PORT
 REDIS_CACHE_EXPIRE = configs.REDIS.EXPIRE
+REDIS_CACHE_SOFT_EXPIRE = min(configs.REDIS.SOFT_EXPIRE, REDIS_CACHE_EXPIRE)
+# Not found responses are kept for a shorter time.
+REDIS_CACHE_NEGATIVE_EXPIRE = min(
+    configs.REDIS.NEGATIVE_EXPIRE, REDIS_CACHE_EXPIRE
+)
+# Single documents shared by all the endpoints.
+REDIS_CACHE_DOCUMENT_EXPIRE = configs.REDIS.DOCUMENT_EXPIRE
+# Eagerness of early refresh, 0 turns it off.
+REDIS_CACHE_XFETCH_BETA = configs.REDIS.XFETCH_BETA
+# Endpoint name -> (soft, hard) expire, overrides the two values above.
+REDIS_CACHE_ENDPOINTS_EXPIRE = configs.REDIS.ENDPOINTS_EXPIRE
+REDIS_CACHE_COMPRESSION = configs.REDIS.COMPRESSION
+REDIS_CACHE_COMPRESSION_THRESHOLD = configs.REDIS.COMPRESSION_THRESHOLD
+REDIS_CACHE_LOCK_ENABLED = configs.REDIS.LOCK_ENABLED
+REDIS_CACHE_LOCK_EXPIRE = configs.REDIS.LOCK_EXPIRE
+REDIS_CACHE_LOCK_POLL_INTERVAL = configs.REDIS.LOCK_POLL_INTERVAL
+
+MEMORY_CACHE_MAX_ENTRIES = configs.MEMORY_CACHE.MAX_ENTRIES
+MEMORY_CACHE_MAX_BYTES = configs.MEMORY_CACHE.MAX_BYTES
+# In-process entries must never outlive the shared Redis ones.
+MEMORY_CACHE_EXPIRE = min(configs.MEMORY_CACHE.EXPIRE, REDIS_CACHE_EXPIRE)
+
+GENRES_REPLICA_REFRESH_INTERVAL = configs.GENRES_REPLICA.REFRESH_INTERVAL
+GENRES_REPLICA_MAX_SIZE = configs.GENRES_REPLICA.MAX_SIZE
+
+SIMILAR_MAX_AGE = configs.SIMILAR.MAX_AGE
+SIMILAR_COUNT = configs.SIMILAR.COUNT
 
 ELASTIC_HOST = configs.ELASTICSEARCH.HOST
 ELASTIC_PORT = configs.ELASTICSEARCH.PORT
 ELASTIC_USERNAME = configs.ELASTICSEARCH.USERNAME
 ELASTIC_PASSWORD = configs.ELASTICSEARCH.PASSWORD
+ELASTIC_MGET_BATCH_SIZE = configs.ELASTICSEARCH.MGET_BATCH_SIZE
+ELASTIC_CURSOR_PIT = configs.ELASTICSEARCH.CURSOR_PIT
+ELASTIC_CURSOR_PIT_KEEP_ALIVE = configs.ELASTICSEARCH.CURSOR_PIT_KEEP_ALIVE
 
 JWT_PUBLIC_KEY = configs.JWT.PUBLIC_KEY
 
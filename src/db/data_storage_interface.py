@@ -6,6 +6,16 @@ class DataStorageInterface(ABC):
     async def get_data_by_id(self, *args, **kwargs) -> dict:
         pass
 
+    @abstractmethod
+    async def get_many(self, *args, **kwargs) -> tuple[list[dict], list]:
+        pass
+
     @abstractmethod
     async def search_data(self, *args, **kwargs) -> list:
         pass
+
+    @abstractmethod
+    async def search_page(
+        self, *args, **kwargs
+    ) -> tuple[list, list | None, str | None]:
+        pass
@@ -0,0 +1,30 @@
+"""Serializer for Elasticsearch client backed by orjson."""
+
+import orjson
+from elasticsearch.exceptions import SerializationError
+from elasticsearch.serializer import JSONSerializer
+
+
+class ORJSONSerializer(JSONSerializer):
+    """Encode request bodies and decode responses with orjson.
+
+    UUID, datetime and date are native to orjson, the rest of the types
+    known to the default serializer go through its default().
+    """
+
+    def loads(self, s):
+        try:
+            return orjson.loads(s)
+        except (orjson.JSONDecodeError, TypeError) as e:
+            raise SerializationError(s, e)
+
+    def dumps(self, data):
+        # don't serialize strings
+        if isinstance(data, str):
+            return data
+
+        try:
+            # Bulk helpers join serialized actions as text, so str it is.
+            return orjson.dumps(data, default=self.default).decode('utf-8')
+        except (orjson.JSONEncodeError, TypeError) as e:
+            raise SerializationError(data, e)
@@ -1,9 +1,13 @@
 from elasticsearch import AsyncElasticsearch
 
+from core.config import ELASTIC_MGET_BATCH_SIZE
 from services.elastic_service import ElasticService
 
 storage: AsyncElasticsearch = None
 
 
 def get_storage():
-    return ElasticService(storage_client=storage)
+    return ElasticService(
+        storage_client=storage,
+        mget_batch_size=ELASTIC_MGET_BATCH_SIZE,
+    )
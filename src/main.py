@@ -1,3 +1,5 @@
+import asyncio
+
 import uvicorn
 from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI
@@ -5,8 +7,13 @@ from fastapi.responses import ORJSONResponse
 from redis.asyncio import Redis
 
 from api.v1 import films, genres, persons
+from cache.invalidation import listen_invalidations
 from core import config
 from db import storage, redis
+from db.serializer import ORJSONSerializer
+from db.storage import get_storage
+from services.cache import get_memory_cache_service
+from services.genre import genres_replica
 
 app = FastAPI(
     title=config.PROJECT_NAME,
@@ -26,11 +33,26 @@ async def startup():
     storage.storage = AsyncElasticsearch(
         [{'host': config.ELASTIC_HOST, 'port': config.ELASTIC_PORT}],
         http_auth=(config.ELASTIC_USERNAME, config.ELASTIC_PASSWORD),
+        serializer=ORJSONSerializer(),
+    )
+    app.state.invalidation_listener = asyncio.create_task(
+        listen_invalidations(
+            redis.redis,
+            get_memory_cache_service(),
+            on_reindex=genres_replica.expire,
+        )
+    )
+    app.state.genres_replica = asyncio.create_task(
+        genres_replica.run(
+            get_storage(), config.GENRES_REPLICA_REFRESH_INTERVAL
+        )
     )
 
 
 @app.on_event('shutdown')
 async def shutdown():
+    app.state.invalidation_listener.cancel()
+    app.state.genres_replica.cancel()
     await redis.redis.close()
     await storage.storage.close()
 
@@ -0,0 +1,32 @@
+import base64
+
+import orjson
+from pydantic import BaseModel
+
+
+class Cursor(BaseModel):
+    """Position of the next page in cursor pagination.
+
+    Clients get it as an opaque url-safe string.
+    """
+
+    search_after: list | None = None
+    pit_id: str | None = None
+
+    @classmethod
+    def decode(cls, value: str) -> 'Cursor':
+        """Parse the cursor string, an empty one points to the first page.
+
+        Raises:
+            ValueError: the string is not a valid cursor.
+        """
+        if not value:
+            return cls()
+        padding = '=' * (-len(value) % 4)
+        return cls.parse_obj(
+            orjson.loads(base64.urlsafe_b64decode(value + padding))
+        )
+
+    def encode(self) -> str:
+        data = orjson.dumps(self.dict(exclude_none=True))
+        return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
@@ -1,6 +1,12 @@
 from uuid import UUID
 from pydantic import BaseModel, Field
 from api.v1.utils import PaginateQueryParams
+from models.cursor import Cursor
+
+# Weights of what films share, the same as in the similar films query of
+# the movies ETL.
+SIMILAR_GENRE_WEIGHT = 1.0
+SIMILAR_PERSON_WEIGHT = 2.0
 
 
 class QueryConstructor(BaseModel):
@@ -8,6 +14,8 @@ class QueryConstructor(BaseModel):
     query: str | None = Field(default=None)
     sort: str | None = Field(default=None)
     filter_genre: UUID = Field(default=None)
+    source: list[str] | None = Field(default=None)
+    cursor: Cursor | None = Field(default=None)
 
     class Config:
         arbitrary_types_allowed = True
@@ -20,14 +28,27 @@ class QueryConstructor(BaseModel):
     def get_films_query(self):
         return {"match": {"title": {"query": self.query, "fuzziness": "AUTO"}}}
 
+    def paginate(self, query_body: dict, sort: list):
+        """Add the page by its number or, in cursor mode, by search_after."""
+        page_size = self.paginate_query_params.page_size
+        query_body['size'] = page_size
+        if self.cursor is None:
+            if self.paginate_query_params.page_number:
+                query_body['from'] = (
+                    self.paginate_query_params.page_number * page_size
+                )
+            if sort:
+                query_body['sort'] = sort
+            return query_body
+        # Unique uuid breaks ties, so the order is the same on every page.
+        query_body['sort'] = [*sort, {"uuid": "asc"}]
+        if self.cursor.search_after:
+            query_body['search_after'] = self.cursor.search_after
+        return query_body
+
     def construct_query(self, elastic_index: str):
         query_body = {}
-
-        if self.paginate_query_params.page_number:
-            query_body['from'] = self.paginate_query_params.page_number
-
-        if self.paginate_query_params.page_size:
-            query_body["size"] = self.paginate_query_params.page_size
+        sort = []
 
         if self.query:
             find_query = {
@@ -36,25 +57,99 @@ class QueryConstructor(BaseModel):
             }
 
             query_body['query'] = find_query[elastic_index]()
-        return query_body
+            sort.append("_score")
+        if self.source:
+            query_body['_source'] = self.source
+        return self.paginate(query_body, sort)
 
     def construct_films_list_query(self):
-        query_body = {"query": {}}
-        if not self.filter_genre:
-            query_body['query']["match_all"] = {}
+        query_body = {"query": {"match_all": {}}}
+        sort = []
         if self.sort:
-            query_body['sort'] = {"imdb_rating": {"order": "desc"}}
-        if self.paginate_query_params:
-            if self.paginate_query_params.page_size:
-                query_body['size'] = self.paginate_query_params.page_size
-            if self.paginate_query_params.page_number:
-                query_body['from'] = self.paginate_query_params.page_number
+            sort.append({"imdb_rating": {"order": "desc"}})
         if self.filter_genre:
             query_body['query'] = {
+                "nested": {
+                    "path": "genre",
+                    "query": {
+                        "constant_score": {
+                            "filter": {
+                                "term": {"genre.uuid": str(self.filter_genre)}
+                            }
+                        }
+                    },
+                }
+            }
+        if self.source:
+            query_body['_source'] = self.source
+        return self.paginate(query_body, sort)
+
+    def construct_similar_films_query(
+        self,
+        film_id: UUID,
+        genre_ids: list[str],
+        person_ids: list[str],
+    ):
+        """Films sharing genres or persons with the film, itself excluded.
+
+        Films are ranked as the movies ETL ranks its similar films lists:
+        shared genres and persons are summed with their weights, the sum
+        is raised by the rating in tenths and ties go in uuid order.
+        """
+        genres_query = {
+            "nested": {
+                "path": "genre",
+                "score_mode": "sum",
                 "query": {
                     "constant_score": {
-                        "filter": {"term": {"genre.uuid": self.filter_genre}}
+                        "filter": {"terms": {"genre.uuid": genre_ids}},
+                        "boost": SIMILAR_GENRE_WEIGHT,
                     }
+                },
+            }
+        }
+        # A person counts once, whatever roles they have in the film.
+        persons_queries = [
+            {
+                "dis_max": {
+                    "queries": [
+                        {
+                            "nested": {
+                                "path": field,
+                                "query": {
+                                    "constant_score": {
+                                        "filter": {
+                                            "term": {f"{field}.uuid": person_id}
+                                        },
+                                        "boost": SIMILAR_PERSON_WEIGHT,
+                                    }
+                                },
+                            }
+                        }
+                        for field in ("actors", "writers", "directors")
+                    ]
                 }
             }
-        return query_body
+            for person_id in person_ids
+        ]
+        query_body = {
+            "query": {
+                "script_score": {
+                    "query": {
+                        "bool": {
+                            "should": [genres_query, *persons_queries],
+                            "minimum_should_match": 1,
+                            "must_not": {"term": {"uuid": str(film_id)}},
+                        }
+                    },
+                    "script": {
+                        "source": "_score * (100 + (doc['imdb_rating']"
+                        ".size() == 0 ? 0 : Math.round(doc['imdb_rating']"
+                        ".value * 10)))"
+                    },
+                }
+            }
+        }
+        if self.source:
+            query_body['_source'] = self.source
+        return self.paginate(query_body, ["_score", {"uuid": "asc"}])
@@ -1,31 +1,131 @@
 from uuid import UUID
 
+import orjson
+
 from api.v1.utils import PaginateQueryParams
+from cache.invalidation import REINDEXED_PREFIX
+from core.config import (
+    ELASTIC_CURSOR_PIT,
+    ELASTIC_CURSOR_PIT_KEEP_ALIVE,
+    REDIS_CACHE_DOCUMENT_EXPIRE,
+)
+from models.cursor import Cursor
 from models.query_constructor import QueryConstructor
 
+DOCUMENT_PREFIX = 'document:'
+
 
 class BaseElasticService:
+    def document_key(self, id: UUID | str) -> str:
+        return f'{DOCUMENT_PREFIX}{self.elastic_index}:{id}'
+
     async def get_by_id(self, id: UUID):
-        data = await self.storage.get_data_by_id(
-            index=self.elastic_index,
-            id=id,
+        data = await self.get_many_by_id([id])
+        return data[0] if data else {}
+
+    async def get_many_by_id(self, ids: list[UUID | str]) -> list[dict]:
+        """
+        Get documents from the cache, fetching only the missed ones.
+
+        Args:
+            ids: list - documents ids.
+
+        Returns:
+            Found documents in the order of ids.
+        """
+        ids = [str(id) for id in ids if id]
+        cached = await self.cache.get_many(
+            [self.document_key(id) for id in ids]
         )
-        return data
+        documents = {
+            id: orjson.loads(value)
+            for id, value in zip(ids, cached)
+            if value is not None
+        }
+        missed = list(dict.fromkeys(id for id in ids if id not in documents))
+        if missed:
+            fetched, missing = await self.storage.get_many(
+                index=self.elastic_index,
+                ids=missed,
+            )
+            missing = set(missing)
+            found = dict(
+                zip([id for id in missed if id not in missing], fetched)
+            )
+            await self.cache.set_many_unless_marked(
+                {
+                    self.document_key(id): orjson.dumps(doc)
+                    for id, doc in found.items()
+                },
+                REDIS_CACHE_DOCUMENT_EXPIRE,
+                REINDEXED_PREFIX,
+            )
+            documents.update(found)
+        return [documents[id] for id in ids if id in documents]
 
-    async def search_data(
+    def build_query(
         self,
         parameters: PaginateQueryParams,
         query: str = None,
         sort: str = None,
         filter: UUID = None,
-    ) -> list:
+        fields: list[str] | None = None,
+        cursor: Cursor | None = None,
+    ) -> dict:
         query_constructor = QueryConstructor(
             query=query,
             sort=sort,
             paginate_query_params=parameters,
+            source=fields,
+            cursor=cursor,
         )
-        query_body = query_constructor.construct_query(self.elastic_index)
+        return query_constructor.construct_query(self.elastic_index)
+
+    async def search_data(
+        self,
+        parameters: PaginateQueryParams,
+        query: str = None,
+        sort: str = None,
+        filter: UUID = None,
+        fields: list[str] | None = None,
+    ) -> list:
+        query_body = self.build_query(parameters, query, sort, filter, fields)
         return await self.storage.search_data(
             query_body=query_body,
             index=self.elastic_index,
         )
+
+    async def search_page(
+        self,
+        parameters: PaginateQueryParams,
+        cursor: Cursor,
+        query: str = None,
+        sort: str = None,
+        filter: UUID = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list, Cursor | None]:
+        """
+        Search the page after the cursor, deep pages cost as much as first.
+
+        Args:
+            parameters: PaginateQueryParams - page size, number is ignored.
+            cursor: Cursor - position of the page.
+
+        Returns:
+            Documents and the cursor of the next page, None on the last one.
+        """
+        query_body = self.build_query(
+            parameters, query, sort, filter, fields, cursor
+        )
+        if ELASTIC_CURSOR_PIT:
+            query_body['pit'] = {
+                'id': cursor.pit_id,
+                'keep_alive': ELASTIC_CURSOR_PIT_KEEP_ALIVE,
+            }
+        documents, search_after, pit_id = await self.storage.search_page(
+            query_body=query_body,
+            index=self.elastic_index,
+        )
+        if len(documents) < parameters.page_size:
+            return documents, None
+        return documents, Cursor(search_after=search_after, pit_id=pit_id)
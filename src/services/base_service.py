@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from uuid import UUID
 
 from api.v1.utils import PaginateQueryParams
+from models.cursor import Cursor
 
 
 class MovieService(ABC):
@@ -9,6 +10,10 @@ class MovieService(ABC):
     async def get_by_id(self, id: UUID) -> dict:
         pass
 
+    @abstractmethod
+    async def get_many_by_id(self, ids: list[UUID]) -> list[dict]:
+        pass
+
     @abstractmethod
     async def search_data(
         self,
@@ -16,5 +21,18 @@ class MovieService(ABC):
         query: str = None,
         sort: str = None,
         filter: UUID = None,
+        fields: list[str] | None = None,
     ) -> list:
         pass
+
+    @abstractmethod
+    async def search_page(
+        self,
+        parameters: PaginateQueryParams,
+        cursor: Cursor,
+        query: str = None,
+        sort: str = None,
+        filter: UUID = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list, Cursor | None]:
+        pass
@@ -1,23 +1,190 @@
+import time
+from collections import OrderedDict
 from functools import lru_cache
-from core.config import CACHE_SERVICE_NAME
+
+from redis.exceptions import WatchError
+
+from core.config import (
+    CACHE_SERVICE_NAME,
+    REDIS_CACHE_COMPRESSION,
+    REDIS_CACHE_COMPRESSION_THRESHOLD,
+    MEMORY_CACHE_EXPIRE,
+    MEMORY_CACHE_MAX_BYTES,
+    MEMORY_CACHE_MAX_ENTRIES,
+)
 from cache.abstract_cache import AbstractBaseCache
+from cache.compression import Compressor
 from db.redis import get_redis
 
 
 @lru_cache
 def get_cache_service():
     if CACHE_SERVICE_NAME == 'redis':
-        return RedisCache()
+        return RedisCache(
+            Compressor(
+                codec=REDIS_CACHE_COMPRESSION,
+                threshold=REDIS_CACHE_COMPRESSION_THRESHOLD,
+            )
+        )
+
+
+@lru_cache
+def get_memory_cache_service():
+    return InMemoryCache(
+        max_entries=MEMORY_CACHE_MAX_ENTRIES,
+        max_bytes=MEMORY_CACHE_MAX_BYTES,
+        expire=MEMORY_CACHE_EXPIRE,
+    )
 
 
 class RedisCache(AbstractBaseCache):
     """Interface for Redis cache service"""
 
-    def __init__(self) -> None:
+    def __init__(self, compressor: Compressor) -> None:
         self.redis = get_redis()
+        self.compressor = compressor
+        self.hits = 0
+        self.misses = 0
 
     async def get(self, key):
-        return await self.redis.get(key)
+        value = await self.redis.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.compressor.decompress(value)
+
+    async def get_with_ttl(self, key):
+        """Value with the seconds it has left to live, None for both on miss."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            value, ttl = await pipe.execute()
+        if value is None:
+            self.misses += 1
+            return None, None
+        self.hits += 1
+        return self.compressor.decompress(value), (
+            ttl / 1000 if ttl > 0 else None
+        )
 
     async def set(self, key, value, expire):
-        return await self.redis.set(key, value, expire)
+        return await self.redis.set(
+            key, self.compressor.compress(value), expire
+        )
+
+    async def get_many(self, keys):
+        values = await self.redis.mget(keys) if keys else []
+        for value in values:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return [
+            self.compressor.decompress(value) if value is not None else None
+            for value in values
+        ]
+
+    async def set_many_unless_marked(self, values, expire, prefix):
+        """
+        Set keys which have no mark with the prefix.
+
+        Marks are watched, so a mark set between the check and the write
+        cancels the write.
+        """
+        marks = [f'{prefix}{key}' for key in values]
+        if not marks:
+            return
+        async with self.redis.pipeline() as pipe:
+            try:
+                await pipe.watch(*marks)
+                marked = await pipe.mget(marks)
+                pipe.multi()
+                for (key, value), mark in zip(values.items(), marked):
+                    if mark is None:
+                        pipe.set(key, self.compressor.compress(value), expire)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def set_tagged_unless_marked(
+        self, key, value, tags, prefix, mark_prefix, expire
+    ):
+        """
+        Set the key and remember it in the set of every tag it depends on,
+        unless a tag set has a mark with the mark prefix.
+
+        Marks are watched, so a mark set between the check and the write
+        cancels the write. Returns whether the key is set.
+        """
+        tag_keys = [f'{prefix}{tag}' for tag in tags]
+        marks = [f'{mark_prefix}{tag_key}' for tag_key in tag_keys]
+        async with self.redis.pipeline() as pipe:
+            try:
+                if marks:
+                    await pipe.watch(*marks)
+                    if any(await pipe.mget(marks)):
+                        return False
+                pipe.multi()
+                pipe.set(key, self.compressor.compress(value), expire)
+                for tag_key in tag_keys:
+                    pipe.sadd(tag_key, key)
+                    # A tag has to live as long as the longest of its keys.
+                    pipe.expire(tag_key, expire, nx=True)
+                    pipe.expire(tag_key, expire, gt=True)
+                await pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    def lock(self, key, expire):
+        """Non-blocking lock shared by all workers using this Redis."""
+        return self.redis.lock(f'lock:{key}', timeout=expire, blocking=False)
+
+
+class InMemoryCache(AbstractBaseCache):
+    """Bounded in-process LRU cache with a TTL for every entry.
+
+    Keeps serialized values only, so the entry size is known and the memory
+    used by the worker is limited by both entries count and total bytes.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, expire: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.expire = expire
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self.delete(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key, value, expire=None):
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        self.delete(key)
+        if self.expire <= 0 or len(value) > self.max_bytes:
+            return
+        expire = min(expire, self.expire) if expire else self.expire
+        self._entries[key] = (time.monotonic() + expire, value)
+        self.size += len(value)
+        while (
+            len(self._entries) > self.max_entries or self.size > self.max_bytes
+        ):
+            self.delete(next(iter(self._entries)))
+
+    def delete(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from fastapi import Request
+
+
+class DataLoader:
+    """Batches and memoizes documents loading within one request.
+
+    All the loads issued in the same event loop tick are sent to storage
+    as one batch, and every document is loaded at most once.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[str]], Awaitable[list[dict]]],
+    ) -> None:
+        self._batch_load = batch_load
+        self._futures: dict[str, asyncio.Future] = {}
+        self._queue: list[str] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, id: UUID | str) -> asyncio.Future:
+        """Document by id, empty dict for a missing one."""
+        id = str(id)
+        future = self._futures.get(id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[id] = future
+            self._queue.append(id)
+            if len(self._queue) == 1:
+                loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, ids: list[UUID | str]) -> list[dict]:
+        """Found documents in the order of ids."""
+        documents = await asyncio.gather(*[self.load(id) for id in ids if id])
+        return [document for document in documents if document]
+
+    def _dispatch(self) -> None:
+        ids, self._queue = self._queue, []
+        task = asyncio.create_task(self._load(ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, ids: list[str]) -> None:
+        try:
+            documents = await self._batch_load(ids)
+        except Exception as error:
+            for id in ids:
+                self._futures[id].set_exception(error)
+            return
+        found = {str(document['uuid']): document for document in documents}
+        for id in ids:
+            self._futures[id].set_result(found.get(id, {}))
+
+
+def get_request_loader(request: Request, service) -> DataLoader:
+    """Loader of the service documents shared by the whole request."""
+    if not hasattr(request.state, 'loaders'):
+        request.state.loaders = {}
+    loader = request.state.loaders.get(service.elastic_index)
+    if loader is None:
+        loader = DataLoader(service.get_many_by_id)
+        request.state.loaders[service.elastic_index] = loader
+    return loader
@@ -1,5 +1,6 @@
 """Helper module for elasticsearch data."""
 
+import asyncio
 from uuid import UUID
 
 import backoff
@@ -14,8 +15,13 @@ from db.data_storage_interface import DataStorageInterface
 
 
 class ElasticService(DataStorageInterface):
-    def __init__(self, storage_client: AsyncElasticsearch):
+    def __init__(
+        self,
+        storage_client: AsyncElasticsearch,
+        mget_batch_size: int = 500,
+    ):
         self._es = storage_client
+        self.mget_batch_size = mget_batch_size
 
     @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
     async def get_data_by_id(self, *args, **kwargs) -> dict:
@@ -27,6 +33,43 @@ class ElasticService(DataStorageInterface):
             return {}
         return doc['_source']
 
+    @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
+    async def get_many(self, *args, **kwargs) -> tuple[list[dict], list]:
+        """
+        Get documents by ids with as few requests as possible.
+
+        Args:
+            index: str - index to get documents from.
+            ids: list - documents ids, split into mget batches.
+
+        Returns:
+            Found documents in the order of ids and ids of missing ones.
+        """
+        index = kwargs.get('index')
+        ids: list[UUID | str] = kwargs.get('ids')
+        batches = [
+            ids[start:start + self.mget_batch_size]
+            for start in range(0, len(ids), self.mget_batch_size)
+        ]
+        try:
+            responses = await asyncio.gather(
+                *[
+                    self._es.mget(body={'ids': batch}, index=index)
+                    for batch in batches
+                ]
+            )
+        except NotFoundError:
+            return [], list(ids)
+        documents = []
+        missing = []
+        for response in responses:
+            for doc in response['docs']:
+                if doc.get('found'):
+                    documents.append(doc['_source'])
+                else:
+                    missing.append(doc['_id'])
+        return documents, missing
+
     @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
     async def search_data(self, *args, **kwargs) -> list:
         query_body = kwargs.get('query_body')
@@ -36,3 +79,49 @@ class ElasticService(DataStorageInterface):
         except NotFoundError:
             return []
         return [data['_source'] for data in doc['hits']['hits']]
+
+    @backoff.on_exception(backoff.expo, (ConnectionError, TransportError))
+    async def search_page(
+        self, *args, **kwargs
+    ) -> tuple[list, list | None, str | None]:
+        """
+        Search one page of a cursor pagination.
+
+        Args:
+            query_body: dict - search body, a point in time to search in is
+                passed as its 'pit', without an id a new one is opened.
+            index: str - index to search in.
+
+        Returns:
+            Documents, sort values of the last hit and the point in time id.
+        """
+        query_body = kwargs.get('query_body')
+        index = kwargs.get('index')
+        pit = query_body.get('pit')
+        if pit is None:
+            try:
+                doc = await self._es.search(body=query_body, index=index)
+            except NotFoundError:
+                return [], None, None
+        else:
+            if not pit.get('id'):
+                pit['id'] = await self.open_point_in_time(index, pit)
+            try:
+                doc = await self._es.search(body=query_body)
+            except NotFoundError:
+                # The point in time has expired, go on in a new one.
+                pit['id'] = await self.open_point_in_time(index, pit)
+                doc = await self._es.search(body=query_body)
+        hits = doc['hits']['hits']
+        return (
+            [data['_source'] for data in hits],
+            hits[-1]['sort'] if hits else None,
+            doc.get('pit_id'),
+        )
+
+    async def open_point_in_time(self, index: str, pit: dict) -> str:
+        response = await self._es.open_point_in_time(
+            index=index,
+            keep_alive=pit['keep_alive'],
+        )
+        return response['id']
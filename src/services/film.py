@@ -4,58 +4,69 @@ from uuid import UUID
 from fastapi import Depends
 
 from api.v1.utils import PaginateQueryParams
+from cache.abstract_cache import AbstractBaseCache
 from db.data_storage_interface import DataStorageInterface
 from db.storage import get_storage
+from models.cursor import Cursor
 from models.query_constructor import QueryConstructor
 from services.base_elastic_services import BaseElasticService
 from services.base_service import MovieService
+from services.cache import get_cache_service
 
 
 class ElasticFilmService(BaseElasticService, MovieService):
     """Represent a films collection from storage."""
 
-    def __init__(self, storage: DataStorageInterface) -> None:
+    def __init__(
+        self,
+        storage: DataStorageInterface,
+        cache: AbstractBaseCache,
+    ) -> None:
         self.storage = storage
+        self.cache = cache
         self.elastic_index = 'movies'
 
-    async def search_data(
+    def build_query(
         self,
         parameters: PaginateQueryParams,
         query: str = None,
         sort: str = None,
         filter: UUID = None,
-    ) -> list:
-        if filter is not None:
-            return await self.get_films(
-                parameters=parameters,
-                sort=sort,
-                filter_genre=filter,
-            )
+        fields: list[str] | None = None,
+        cursor: Cursor | None = None,
+    ) -> dict:
         query_constructor = QueryConstructor(
-            sort=sort,
             query=query,
+            sort=sort,
+            filter_genre=filter,
             paginate_query_params=parameters,
+            source=fields,
+            cursor=cursor,
         )
-        query_body = query_constructor.construct_query(self.elastic_index)
-        return await self.storage.search_data(
-            query_body=query_body,
-            index=self.elastic_index,
-        )
+        if query:
+            return query_constructor.construct_query(self.elastic_index)
+        return query_constructor.construct_films_list_query()
 
-    async def get_films(
+    async def get_similar(
         self,
+        film_id: UUID,
+        genre_ids: list[str],
+        person_ids: list[str],
         parameters: PaginateQueryParams,
-        filter_genre: UUID,
-        sort: str = None,
-    ):
+        fields: list[str] | None = None,
+    ) -> list:
+        """Films similar by genres and persons, found with a single search."""
         query_constructor = QueryConstructor(
             paginate_query_params=parameters,
-            sort=sort,
-            filter_genre=filter_genre,
+            source=fields,
+        )
+        query_body = query_constructor.construct_similar_films_query(
+            film_id,
+            genre_ids,
+            person_ids,
         )
-        query_body = query_constructor.construct_films_list_query()
         return await self.storage.search_data(
-            body=query_body,
+            query_body=query_body,
             index=self.elastic_index,
         )
 
@@ -63,5 +74,6 @@ class ElasticFilmService(BaseElasticService, MovieService):
 @lru_cache()
 def get_elastic_film_service(
     storage: DataStorageInterface = Depends(get_storage),
+    cache: AbstractBaseCache = Depends(get_cache_service),
 ):
-    return ElasticFilmService(storage)
+    return ElasticFilmService(storage, cache)
@@ -1,23 +1,154 @@
+import asyncio
+import bisect
+import logging
 from functools import lru_cache
+from uuid import UUID
 
 from fastapi import Depends
 
+from api.v1.utils import PaginateQueryParams
+from cache.abstract_cache import AbstractBaseCache
+from core.config import GENRES_REPLICA_MAX_SIZE
 from db.data_storage_interface import DataStorageInterface
 from db.storage import get_storage
+from models.cursor import Cursor
 from services.base_elastic_services import BaseElasticService
 from services.base_service import MovieService
+from services.cache import get_cache_service
+
+
+class GenresReplica:
+    """Whole genres index kept in process memory.
+
+    The index is tiny and rarely changes, so it is read at startup and
+    then again periodically or as soon as the genres ETL reindexes it.
+    """
+
+    def __init__(self) -> None:
+        self.genres: dict[str, dict] = {}
+        self.uuids: list[str] = []
+        self.loaded = False
+        self._expired = asyncio.Event()
+
+    async def load(self, storage: DataStorageInterface) -> None:
+        genres = await storage.search_data(
+            query_body={
+                'query': {'match_all': {}},
+                'sort': [{'uuid': 'asc'}],
+                'size': GENRES_REPLICA_MAX_SIZE,
+            },
+            index='genres',
+        )
+        if len(genres) >= GENRES_REPLICA_MAX_SIZE:
+            # The index may not fit, a cut replica would miss genres.
+            self.loaded = False
+            logging.error(
+                'Genres index reached GENRES_REPLICA_MAX_SIZE=%d genres, '
+                'genres are served from storage',
+                GENRES_REPLICA_MAX_SIZE,
+            )
+            return
+        self.genres = {str(genre['uuid']): genre for genre in genres}
+        self.uuids = list(self.genres)
+        # A missing or empty index is not worth serving, storage is asked
+        # until the next refresh finds genres.
+        self.loaded = bool(genres)
+        logging.info('Genres replica loaded %d genres', len(genres))
+
+    def expire(self, index: str = 'genres') -> None:
+        """Reload the replica as soon as possible after genres reindex."""
+        if index == 'genres':
+            self._expired.set()
+
+    async def run(self, storage: DataStorageInterface, interval: int) -> None:
+        while True:
+            self._expired.clear()
+            try:
+                await self.load(storage)
+            except Exception:
+                logging.exception('Genres replica refresh failed')
+            try:
+                await asyncio.wait_for(self._expired.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+genres_replica = GenresReplica()
 
 
 class ElasticGenresService(BaseElasticService, MovieService):
-    """Represents a genres collection from storage."""
+    """Represents a genres collection from storage.
+
+    Served from the in-memory replica once it is loaded.
+    """
 
-    def __init__(self, storage: DataStorageInterface) -> None:
+    def __init__(
+        self,
+        storage: DataStorageInterface,
+        cache: AbstractBaseCache,
+        replica: GenresReplica,
+    ) -> None:
         self.storage = storage
+        self.cache = cache
+        self.replica = replica
         self.elastic_index = 'genres'
 
+    async def get_many_by_id(self, ids: list[UUID | str]) -> list[dict]:
+        if not self.replica.loaded:
+            return await super().get_many_by_id(ids)
+        # The replica holds the whole index, a genre it misses does not
+        # exist until the reindex message reloads it.
+        genres = self.replica.genres
+        return [genres[str(id)] for id in ids if str(id) in genres]
+
+    async def search_data(
+        self,
+        parameters: PaginateQueryParams,
+        query: str = None,
+        sort: str = None,
+        filter: UUID = None,
+        fields: list[str] | None = None,
+    ) -> list:
+        if not self.replica.loaded:
+            return await super().search_data(
+                parameters, query, sort, filter, fields
+            )
+        start = parameters.page_number * parameters.page_size
+        return [
+            self.replica.genres[uuid]
+            for uuid in self.replica.uuids[
+                start:start + parameters.page_size
+            ]
+        ]
+
+    async def search_page(
+        self,
+        parameters: PaginateQueryParams,
+        cursor: Cursor,
+        query: str = None,
+        sort: str = None,
+        filter: UUID = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list, Cursor | None]:
+        if not self.replica.loaded:
+            return await super().search_page(
+                parameters, cursor, query, sort, filter, fields
+            )
+        # Same order and cursor as the uuid sorted search in storage.
+        uuids = self.replica.uuids
+        start = 0
+        if cursor.search_after:
+            start = bisect.bisect_right(uuids, cursor.search_after[0])
+        page = uuids[start:start + parameters.page_size]
+        genres = [self.replica.genres[uuid] for uuid in page]
+        if len(page) < parameters.page_size:
+            return genres, None
+        return genres, Cursor(search_after=[page[-1]])
+
 
 @lru_cache()
 def get_elastic_genres_service(
     storage: DataStorageInterface = Depends(get_storage),
+    cache: AbstractBaseCache = Depends(get_cache_service),
 ):
-    return ElasticGenresService(storage)
+    return ElasticGenresService(storage, cache, genres_replica)
@@ -2,22 +2,30 @@ from functools import lru_cache
 
 from fastapi import Depends
 
+from cache.abstract_cache import AbstractBaseCache
 from db.data_storage_interface import DataStorageInterface
 from db.storage import get_storage
 from services.base_elastic_services import BaseElasticService
 from services.base_service import MovieService
+from services.cache import get_cache_service
 
 
 class ElasticPersonsService(BaseElasticService, MovieService):
     """Represents a persons collection from storage."""
 
-    def __init__(self, storage: DataStorageInterface) -> None:
+    def __init__(
+        self,
+        storage: DataStorageInterface,
+        cache: AbstractBaseCache,
+    ) -> None:
         self.storage = storage
+        self.cache = cache
         self.elastic_index = 'persons'
 
 
 @lru_cache()
 def get_elastic_persons_service(
     storage: DataStorageInterface = Depends(get_storage),
+    cache: AbstractBaseCache = Depends(get_cache_service),
 ):
-    return ElasticPersonsService(storage)
+    return ElasticPersonsService(storage, cache)
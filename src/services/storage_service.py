@@ -1,5 +1,6 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 
+from services.data_loader import get_request_loader
 from services.film import ElasticFilmService, get_elastic_film_service
 from services.genre import ElasticGenresService, get_elastic_genres_service
 from services.persons import ElasticPersonsService, get_elastic_persons_service
@@ -23,3 +24,10 @@ def get_genres_service(
     genres_service: ElasticGenresService = Depends(get_elastic_genres_service),
 ):
     return genres_service
+
+
+def get_film_loader(
+    request: Request,
+    film_service: ElasticFilmService = Depends(get_film_service),
+):
+    return get_request_loader(request, film_service)
@@ -1,12 +1,21 @@
 import json
 import logging
+import time
+from datetime import datetime, timezone
 from typing import Generator
 
 import aiohttp
 import backoff
 import pytest
+import pytest_asyncio
 from elasticsearch import AsyncElasticsearch, Elasticsearch, TransportError
 from functional.settings import index_names, test_indexes, test_settings
+from functional.utils.etl_movies_transform import (
+    Transformer as MoviesTransformer,
+)
+from functional.utils.etl_persons_transform import (
+    Transformer as PersonsTransformer,
+)
 from functional.utils.helpers import fake
 from pydantic import BaseModel, FilePath
 from redis import Redis
@@ -21,6 +30,14 @@ persons_names = [fake.name() for _ in range(10)]
 
 FILM_UUID = str(fake.uuid4())
 PERSON_UUID = str(fake.uuid4())
+SIMILAR_GENRE_UUID = str(fake.uuid4())
+
+# Roles of persons in PostgreSQL and the fields of films listing them.
+ROLE_FIELDS = (
+    ('actor', 'actors'),
+    ('writer', 'writers'),
+    ('director', 'directors'),
+)
 
 
 class ElasticIndex(BaseModel):
@@ -75,6 +92,120 @@ def get_es_bulk_query(
     return bulk_query
 
 
+def with_precomputed_films(films: list[dict]) -> list[dict]:
+    """Films as movies ETL transforms and indexes them.
+
+    The rest of the films, up to the stored list size, are the similar
+    films of the first one, in the order movies ETL ranks them.
+    """
+    rows = [
+        {
+            'filmwork_id': film['uuid'],
+            'title': film['title'],
+            'description': film['description'],
+            'rating': film['imdb_rating'],
+            'file_path': None,
+            'type': 'movie',
+            'creation_date': None,
+            'updated_at': datetime.now(timezone.utc),
+            'genres': [
+                {'genre_uuid': genre['uuid'], 'genre_name': genre['name']}
+                for genre in film['genre']
+            ],
+            'persons': [
+                {
+                    'person_role': role,
+                    'person_uuid': person['uuid'],
+                    'person_full_name': person['full_name'],
+                }
+                for role, field in ROLE_FIELDS
+                for person in film[field]
+            ],
+        }
+        for film in films
+    ]
+    transformer = MoviesTransformer(redis=None)
+    documents = {
+        action['_id']: action['_source']
+        for action in transformer.prepare_for_es(rows)
+    }
+    similar_data = [
+        {
+            'filmwork_id': films[0]['uuid'],
+            'similar': [
+                {
+                    'uuid': other['uuid'],
+                    'title': other['title'],
+                    'imdb_rating': other['imdb_rating'],
+                }
+                for other in films[1:test_settings.similar_count + 1]
+            ],
+        }
+    ]
+    for action in transformer.prepare_similar_for_es(
+        similar_data, int(time.time())
+    ):
+        documents[action['_id']].update(action['doc'])
+    return list(documents.values())
+
+
+def with_precomputed_persons(
+        persons: list[dict], films: list[dict]
+) -> list[dict]:
+    """Persons as persons ETL transforms and indexes them."""
+    rows = [
+        {
+            'id': person['uuid'],
+            'full_name': person['full_name'],
+            'film_work_ids': '{%s}' % ','.join(person['film_work_ids']),
+            'films': [
+                {
+                    'uuid': film['uuid'],
+                    'title': film['title'],
+                    'imdb_rating': film['imdb_rating'],
+                    'roles': [
+                        role
+                        for role, field in ROLE_FIELDS
+                        if any(
+                            member['uuid'] == person['uuid']
+                            for member in film[field]
+                        )
+                    ],
+                }
+                for film in films
+                if film['uuid'] in person['film_work_ids']
+            ],
+        }
+        for person in persons
+    ]
+    return [
+        action['_source']
+        for action in PersonsTransformer(redis=None).prepare_for_es(rows)
+    ]
+
+
+def invalidate_cache(ids: list[str], index: str) -> None:
+    """Evict cached documents and responses as ETL loaders do."""
+    with Redis(host=test_settings.redis_host, port=6379, db=0) as client:
+        tags = [f'tag:{id}' for id in ids]
+        documents = [f'document:{index}:{id}' for id in ids]
+        keys = set().union(*(client.smembers(tag) for tag in tags))
+        for key in (*tags, *documents):
+            client.set(f'reindexed:{key}', 1, ex=30)
+        client.delete(*tags, *documents, *keys)
+        # The API reloads its genres replica on the message as well.
+        client.publish(
+            'cache_invalidation',
+            json.dumps(
+                {
+                    'ids': ids,
+                    'index': index,
+                    'keys': [key.decode('utf-8') for key in keys],
+                }
+            ),
+        )
+
+
 @pytest.fixture(autouse=True, scope='session')
 def redis_client() -> Generator[Redis, None, None]:
     redis_client = Redis(host=test_settings.redis_host, port=6379, db=0)
@@ -83,13 +214,13 @@ def redis_client() -> Generator[Redis, None, None]:
     redis_client.close()
 
 
-@pytest.fixture(scope='function')
+@pytest_asyncio.fixture(scope='function')
 async def get_client_session():
     async with aiohttp.ClientSession() as session:
         yield session
 
 
-@pytest.fixture()
+@pytest_asyncio.fixture()
 async def es_client(request) -> Generator[AsyncElasticsearch, None, None]:
     es_client = AsyncElasticsearch(
         test_settings.es_host,
@@ -124,14 +255,16 @@ def cleanup(request):
 @pytest.fixture
 def es_write_data(es_client):
     async def inner(data: list[dict], index: str):
-        async for client in es_client:
-            bulk_query = get_es_bulk_query(
-                data, index, test_settings.es_id_field
-            )
-            str_query = '\n'.join(bulk_query) + '\n'
-            response = await client.bulk(body=str_query, refresh=True)
-            if response['errors']:
-                raise Exception('Ошибка записи данных в Elasticsearch')
+        bulk_query = get_es_bulk_query(
+            data, index, test_settings.es_id_field
+        )
+        str_query = '\n'.join(bulk_query) + '\n'
+        response = await es_client.bulk(body=str_query, refresh=True)
+        if response['errors']:
+            raise Exception('Ошибка записи данных в Elasticsearch')
+        invalidate_cache(
+            [row[test_settings.es_id_field] for row in data], index
+        )
 
     return inner
 
@@ -153,9 +286,8 @@ def make_genre_id_request(get_client_session):
     async def inner():
         uuid_to_get = genres_uuids[3]
         url = test_settings.service_url + f'/api/v1/genres/{uuid_to_get}'
-        async for session in get_client_session:
-            response = await session.get(url)
-            return response
+        response = await get_client_session.get(url)
+        return response
 
     return inner
 
@@ -164,9 +296,8 @@ def make_genre_id_request(get_client_session):
 def make_genres_request(get_client_session):
     async def inner():
         url = test_settings.service_url + '/api/v1/genres/'
-        async for session in get_client_session:
-            response = await session.get(url)
-            return response
+        response = await get_client_session.get(url)
+        return response
 
     return inner
 
@@ -229,9 +360,10 @@ def film_data():
 def make_get_request(get_client_session):
     async def inner(**kwargs):
         url = test_settings.service_url + kwargs.get('endpoint_url')
-        async for session in get_client_session:
-            response = await session.get(url, params=kwargs.get('query_data'))
-            return response
+        response = await get_client_session.get(
+            url, params=kwargs.get('query_data')
+        )
+        return response
 
     return inner
 
@@ -241,9 +373,8 @@ def make_person_get_request(get_client_session):
     async def inner():
         uuid_to_get = persons_uuids[3]
         url = test_settings.service_url + f'/api/v1/persons/{uuid_to_get}'
-        async for session in get_client_session:
-            response = await session.get(url)
-            return response
+        response = await get_client_session.get(url)
+        return response
 
     return inner
 
@@ -253,9 +384,8 @@ def make_film_request(get_client_session):
     async def inner():
         uuid_to_get = PERSON_UUID
         url = test_settings.service_url + f'/api/v1/persons/{uuid_to_get}/film'
-        async for session in get_client_session:
-            response = await session.get(url)
-            return response
+        response = await get_client_session.get(url)
+        return response
 
     return inner
 
@@ -276,9 +406,8 @@ def make_film_search_request(get_client_session):
             url = test_settings.service_url + '/api/v1/films/search'
         if page_size:
             url += f'?page_size={page_size}'
-        async for session in get_client_session:
-            response = await session.get(url, params=params)
-            return response
+        response = await get_client_session.get(url, params=params)
+        return response
 
     return inner
 
@@ -311,3 +440,46 @@ def es_movies_data() -> list[dict]:
         for _ in range(60)
     ]
     return es_data
+
+
+@pytest.fixture
+def similar_films_data() -> list[dict]:
+    """A film and films sharing its genres or persons.
+
+    Shared genres count one, shared persons two, whatever their roles, and
+    the sum is raised by the rating. The similar films go in that order,
+    which is not the order of their ratings.
+    """
+    genres = [
+        {'uuid': SIMILAR_GENRE_UUID, 'name': 'Drama'},
+        {'uuid': str(fake.uuid4()), 'name': 'Western'},
+    ]
+    person = {'uuid': str(fake.uuid4()), 'full_name': 'Ann'}
+    films = [
+        # Title, rating, genres, actors, writers and directors of the film.
+        ('Source', 7.0, genres, [person], [], []),
+        # Score 3 * 1.1, a genre and the person in two roles.
+        ('Shared person', 1.0, genres[:1], [person], [person], []),
+        # Score 2 * 1.5, both genres.
+        ('Shared genres', 5.0, genres, [], [], []),
+        # Score 2 * 1.2, the person only.
+        ('Shared director', 2.0, [], [], [], [person]),
+        # Score 1 * 1.9, a genre.
+        ('Shared genre', 9.0, genres[:1], [], [], []),
+    ]
+    es_data = [
+        {
+            'uuid': str(fake.uuid4()),
+            'imdb_rating': rating,
+            'genre': film_genres,
+            'title': title,
+            'description': 'Same genre',
+            'directors': directors,
+            'actors_names': [actor['full_name'] for actor in actors],
+            'writers_names': [writer['full_name'] for writer in writers],
+            'actors': actors,
+            'writers': writers,
+        }
+        for title, rating, film_genres, actors, writers, directors in films
+    ]
+    return es_data
@@ -31,6 +31,8 @@ class TestSettings(BaseSettings):
         )
     )
 
+    similar_count: int = Field(default=50, env='SIMILAR_COUNT')
+
     redis_host: str = Field(..., env='REDIS_CACHE_API_HOST')
     service_url: str = Field(..., env='SERVICE_URL')
 
@@ -3,7 +3,9 @@ import random
 from http import HTTPStatus
 
 import pytest
+from functional.conftest import with_precomputed_films
 from functional.settings import test_settings
+from functional.utils.helpers import fake
 
 pytestmark = pytest.mark.asyncio
 
@@ -44,6 +46,35 @@ async def test_all_films_pagination(make_get_request, page_size, page_num, expec
         assert len(body) == page_size
 
 
+@pytestmark
+async def test_all_films_second_page(
+        es_write_data,
+        make_get_request,
+        similar_films_data,
+):
+    genre = {'uuid': str(fake.uuid4()), 'name': 'Noir'}
+    films = sorted(
+        (dict(film, genre=[genre]) for film in similar_films_data),
+        key=lambda film: -film['imdb_rating'],
+    )
+    await es_write_data(films, test_settings.es_movies_index)
+    endpoint_url = f"/api/v1/films/?genre={genre['uuid']}&page_size=2"
+    pages = []
+    for page_number in range(3):
+        response = await make_get_request(
+            endpoint_url=f'{endpoint_url}&page_number={page_number}'
+        )
+        assert response.status == HTTPStatus.OK
+        pages.append([film.get('uuid') for film in await response.json()])
+
+    # Pages follow the rating order without overlaps.
+    assert pages == [
+        [film['uuid'] for film in films[:2]],
+        [film['uuid'] for film in films[2:4]],
+        [film['uuid'] for film in films[4:]],
+    ]
+
+
 @pytestmark
 async def test_all_films_query_params(make_get_request):
     endpoint_url = '/api/v1/films?page_size=5'
@@ -64,6 +95,28 @@ async def test_non_existing_film(make_get_request):
     assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
+@pytestmark
+async def test_missing_film_until_indexed(
+        es_write_data,
+        make_get_request,
+        film_data,
+):
+    film = dict(film_data[0], uuid=str(fake.uuid4()))
+    endpoint_url = '/api/v1/films/' + film['uuid']
+    for _ in range(2):
+        response = await make_get_request(endpoint_url=endpoint_url)
+
+        # The second response comes from the cached not found one.
+        assert response.status == HTTPStatus.NOT_FOUND
+
+    # Indexing evicts the cached not found response as ETL does.
+    await es_write_data([film], test_settings.es_movies_index)
+    response = await make_get_request(endpoint_url=endpoint_url)
+
+    assert response.status == HTTPStatus.OK
+    assert (await response.json()).get('uuid') == film['uuid']
+
+
 @pytest.mark.parametrize("page_size, expected_status", [
     (10, HTTPStatus.OK),
     (-10, HTTPStatus.UNPROCESSABLE_ENTITY),
@@ -77,3 +130,102 @@ async def test_search_film(make_film_search_request, page_size, expected_status)
     assert status == expected_status
     if expected_status == HTTPStatus.OK:
         assert body[0].get('title') == 'The Star'
+
+
+@pytestmark
+async def test_all_films_cursor_pagination(es_movies_data, make_get_request):
+    films = []
+    cursor = ''
+    while cursor is not None:
+        endpoint_url = f'/api/v1/films/?page_size=7&cursor={cursor}'
+        response = await make_get_request(endpoint_url=endpoint_url)
+        body = await response.json()
+
+        assert response.status == HTTPStatus.OK
+        films.extend(body.get('items'))
+        cursor = body.get('next_cursor')
+
+    assert len({film.get('uuid') for film in films}) == len(films)
+    assert len(films) >= len(es_movies_data)
+
+
+@pytestmark
+async def test_precomputed_film_as_model(
+        es_write_data,
+        make_get_request,
+        similar_films_data,
+):
+    await es_write_data(similar_films_data, test_settings.es_movies_index)
+    film_id = similar_films_data[0]['uuid']
+    endpoint_urls = [
+        f'/api/v1/films/{film_id}',
+        f'/api/v1/films/{film_id}/similar',
+        f'/api/v1/films/{film_id}/similar?page_size=2&page_number=1',
+    ]
+    expected_bodies = []
+    for endpoint_url in endpoint_urls:
+        response = await make_get_request(endpoint_url=endpoint_url)
+        assert response.status == HTTPStatus.OK
+        expected_bodies.append(await response.json())
+    # Films sharing more go first, as in the lists of movies ETL.
+    assert [film.get('uuid') for film in expected_bodies[1]] == [
+        film['uuid'] for film in similar_films_data[1:]
+    ]
+
+    # Rendered JSON and similar films of movies ETL are served as they are.
+    await es_write_data(
+        with_precomputed_films(similar_films_data),
+        test_settings.es_movies_index,
+    )
+    for endpoint_url, expected_body in zip(endpoint_urls, expected_bodies):
+        response = await make_get_request(endpoint_url=endpoint_url)
+
+        assert response.status == HTTPStatus.OK
+        assert await response.json() == expected_body
+
+
+@pytestmark
+async def test_similar_films_past_stored_list(
+        es_write_data,
+        make_get_request,
+        film_data,
+):
+    genre = {'uuid': str(fake.uuid4()), 'name': 'Noir'}
+    films = [
+        dict(
+            film_data[0],
+            uuid=str(fake.uuid4()),
+            genre=[genre],
+            imdb_rating=round(9.9 - number / 10, 1),
+            directors=[],
+            actors=[],
+            writers=[],
+        )
+        for number in range(test_settings.similar_count + 3)
+    ]
+    await es_write_data(films, test_settings.es_movies_index)
+    endpoint_url = f"/api/v1/films/{films[0]['uuid']}/similar?page_size=10"
+    pages = range(test_settings.similar_count // 10 + 1)
+    expected_bodies = []
+    for page_number in pages:
+        response = await make_get_request(
+            endpoint_url=f'{endpoint_url}&page_number={page_number}'
+        )
+        assert response.status == HTTPStatus.OK
+        expected_bodies.append(await response.json())
+
+    # Pages past the stored list are searched and go on with the list.
+    await es_write_data(
+        with_precomputed_films(films),
+        test_settings.es_movies_index,
+    )
+    for page_number, expected_body in zip(pages, expected_bodies):
+        response = await make_get_request(
+            endpoint_url=f'{endpoint_url}&page_number={page_number}'
+        )
+
+        assert response.status == HTTPStatus.OK
+        assert await response.json() == expected_body
+    assert [
+        film.get('uuid') for body in expected_bodies for film in body
+    ] == [film['uuid'] for film in films[1:]]
@@ -2,7 +2,13 @@ import logging
 from http import HTTPStatus
 
 import pytest
-from functional.conftest import FILM_UUID, persons_names, persons_uuids
+from functional.conftest import (
+    FILM_UUID,
+    PERSON_UUID,
+    persons_names,
+    persons_uuids,
+    with_precomputed_persons,
+)
 from functional.settings import test_settings
 
 pytestmark = pytest.mark.asyncio
@@ -40,6 +46,37 @@ async def test_get_persons_film(es_write_data, make_film_request, film_data):
     assert body[0].get('title') == 'Terminator'
 
 
+@pytestmark
+async def test_precomputed_person_as_model(
+        es_write_data,
+        make_get_request,
+        persons_data,
+        film_data,
+):
+    await es_write_data(film_data, test_settings.es_movies_index)
+    await es_write_data(persons_data, test_settings.es_persons_index)
+    endpoint_urls = [
+        f'/api/v1/persons/{PERSON_UUID}',
+        f'/api/v1/persons/{PERSON_UUID}/film',
+    ]
+    expected_bodies = []
+    for endpoint_url in endpoint_urls:
+        response = await make_get_request(endpoint_url=endpoint_url)
+        assert response.status == HTTPStatus.OK
+        expected_bodies.append(await response.json())
+
+    # Films and rendered JSON of persons ETL are served as they are.
+    await es_write_data(
+        with_precomputed_persons(persons_data, film_data),
+        test_settings.es_persons_index,
+    )
+    for endpoint_url, expected_body in zip(endpoint_urls, expected_bodies):
+        response = await make_get_request(endpoint_url=endpoint_url)
+
+        assert response.status == HTTPStatus.OK
+        assert await response.json() == expected_body
+
+
 @pytest.mark.parametrize("page_size, expected_status", [
     (10, HTTPStatus.OK),
     (-10, HTTPStatus.UNPROCESSABLE_ENTITY),